@@ -1,39 +1,137 @@
 """
 Agent definitions for Competitor Analysis System
-Defines three specialized agents: Research, Analysis, and Report
+Defines the Research, Analysis, and Report agents and sizes the crew to each job
 """
 
+import atexit
+import asyncio
 import logging
-from crewai import Agent
-from langchain_openai import ChatOpenAI
+from functools import lru_cache
+from itertools import cycle, islice
+from typing import TYPE_CHECKING, Optional
+import httpx
 import config
-from tools import (
-    competitor_search_tool,
-    company_info_tool,
-    pricing_search_tool,
-    review_search_tool,
-    data_processor_tool
-)
+
+# crewai, langchain_openai, openai, and the tools module (crewai_tools) are
+# imported inside the functions that need them to keep app cold-start fast
+if TYPE_CHECKING:
+    from crewai import Agent
+    from openai import AsyncOpenAI
 
 logger = logging.getLogger(__name__)
 
+# Shared connection pools so every ChatOpenAI reuses keep-alive connections.
+# Idle connections are kept for a minute so a warmed connection survives the
+# time a user spends filling in the sidebar form
+_HTTP_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=16, keepalive_expiry=60)
+_HTTP_CLIENT = httpx.Client(limits=_HTTP_LIMITS, timeout=60)
+_AHTTP_CLIENT = httpx.AsyncClient(limits=_HTTP_LIMITS, timeout=60)
+
+
+def _close_http_clients():
+    """Close the shared HTTP clients at interpreter shutdown"""
+    _HTTP_CLIENT.close()
+    try:
+        asyncio.run(_AHTTP_CLIENT.aclose())
+    except Exception:
+        # Connections opened on the (already stopped) pipeline loop can't be
+        # closed from a new loop; the process is exiting anyway
+        pass
+
+
+atexit.register(_close_http_clients)
+
+_OPENAI_MODELS_URL = "https://api.openai.com/v1/models"
+
+
+def _log_warm_result(label: str, response: httpx.Response) -> None:
+    """Log a warm-up request; failures are expected and only logged at debug"""
+    if response.is_success:
+        logger.info(f"Warmed {label}")
+    else:
+        logger.debug(f"Could not warm {label}: HTTP {response.status_code}")
+
+
+def warm_openai_connection():
+    """Open a keep-alive connection to OpenAI on the shared sync pool"""
+    try:
+        response = _HTTP_CLIENT.get(_OPENAI_MODELS_URL, headers={"Authorization": f"Bearer {config.OPENAI_API_KEY}"})
+    except httpx.HTTPError as e:
+        logger.debug(f"Could not warm OpenAI connection: {str(e)}")
+        return
+    _log_warm_result("OpenAI connection", response)
+
 
-def create_llm(temperature: float = 0.7):
-    """Create and configure the LLM instance"""
+async def awarm_openai_connection():
+    """Open a keep-alive connection to OpenAI on the shared async pool"""
+    try:
+        response = await _AHTTP_CLIENT.get(_OPENAI_MODELS_URL, headers={"Authorization": f"Bearer {config.OPENAI_API_KEY}"})
+    except httpx.HTTPError as e:
+        logger.debug(f"Could not warm async OpenAI connection: {str(e)}")
+        return
+    _log_warm_result("async OpenAI connection", response)
+
+
+@lru_cache(maxsize=None)
+def create_llm(temperature: float = 0.7, model: str = config.OPENAI_MODEL):
+    """Create and configure the LLM instance (shared per model/temperature)"""
+    from langchain_openai import ChatOpenAI
+    
+    config.setup_llm_caching()
+    
     return ChatOpenAI(
-        model=config.OPENAI_MODEL,
+        model=model,
         temperature=temperature,
-        api_key=config.OPENAI_API_KEY
+        api_key=config.OPENAI_API_KEY,
+        http_client=_HTTP_CLIENT,
+        http_async_client=_AHTTP_CLIENT
+    )
+
+
+@lru_cache(maxsize=None)
+def create_async_openai_client() -> "AsyncOpenAI":
+    """Create a raw OpenAI client (shared pool) for endpoints LangChain doesn't wrap"""
+    from openai import AsyncOpenAI
+    
+    return AsyncOpenAI(
+        api_key=config.OPENAI_API_KEY,
+        http_client=_AHTTP_CLIENT
+    )
+
+
+@lru_cache(maxsize=32)
+def _build_goal(role: str, company_name: str, industry: str) -> str:
+    """Render an agent goal once per (role, company, industry)"""
+    template = config.AGENT_GOAL_TEMPLATES_BY_INDUSTRY.get(
+        (role, industry),
+        config.AGENT_GOAL_TEMPLATES[role]
+    )
+    return template.substitute(
+        company_name=company_name,
+        industry=industry
     )
 
 
-def create_research_agent(company_name: str, industry: str) -> Agent:
+def _research_tools() -> list:
+    """Search tools shared by every research-capable agent"""
+    from tools import get_tools
+    
+    tools = get_tools()
+    
+    # The probe tool comes first: one call covers info, pricing and reviews
+    return [tools[key] for key in ("search", "probe", "company", "profile", "pricing", "reviews")]
+
+
+def create_research_agent(company_name: str, industry: str, memory: bool = False,
+                          focus: Optional[str] = None) -> "Agent":
     """
     Create Research Agent - Specialist in gathering competitor data
     
     Args:
         company_name: Name of the company being analyzed
         industry: Industry sector
+        memory: Whether the agent keeps memory (only worthwhile for deep analysis)
+        focus: Optional key of config.RESEARCH_SPECIALTIES to specialize the agent
         
     Returns:
         Agent: Configured research agent
@@ -42,41 +140,40 @@ def create_research_agent(company_name: str, industry: str) -> Agent:
     
     role = config.RESEARCH_AGENT_ROLE
     
-    goal = config.RESEARCH_AGENT_GOAL.format(
-        company_name=company_name,
-        industry=industry
-    )
+    goal = _build_goal("research", company_name, industry)
     
     backstory = config.RESEARCH_AGENT_BACKSTORY
     
+    if focus:
+        role = f"{role} ({focus})"
+        backstory = f"{backstory} {config.RESEARCH_SPECIALTIES[focus]}"
+    
+    from crewai import Agent
+    
     agent = Agent(
         role=role,
         goal=goal,
         backstory=backstory,
-        tools=[
-            competitor_search_tool,
-            company_info_tool,
-            pricing_search_tool,
-            review_search_tool
-        ],
+        tools=_research_tools(),
         llm=create_llm(temperature=0.5),
         verbose=True,
         allow_delegation=False,
-        max_iter=15,
-        memory=True
+        max_iter=3,
+        memory=memory
     )
     
     logger.info("Research Agent created successfully")
     return agent
 
 
-def create_analysis_agent(company_name: str, industry: str) -> Agent:
+def create_analysis_agent(company_name: str, industry: str, memory: bool = False) -> "Agent":
     """
     Create Analysis Agent - Expert in competitive analysis and SWOT
     
     Args:
         company_name: Name of the company being analyzed
         industry: Industry sector
+        memory: Whether the agent keeps memory (only worthwhile for deep analysis)
         
     Returns:
         Agent: Configured analysis agent
@@ -85,36 +182,80 @@ def create_analysis_agent(company_name: str, industry: str) -> Agent:
     
     role = config.ANALYSIS_AGENT_ROLE
     
-    goal = config.ANALYSIS_AGENT_GOAL.format(
-        company_name=company_name,
-        industry=industry
-    )
+    goal = _build_goal("analysis", company_name, industry)
     
     backstory = config.ANALYSIS_AGENT_BACKSTORY
     
+    from crewai import Agent
+    from tools import get_tools
+    
     agent = Agent(
         role=role,
         goal=goal,
         backstory=backstory,
-        tools=[data_processor_tool],
+        tools=[get_tools()["data"]],
         llm=create_llm(temperature=0.4),
         verbose=True,
         allow_delegation=False,
         max_iter=15,
-        memory=True
+        memory=memory
     )
     
     logger.info("Analysis Agent created successfully")
     return agent
 
 
-def create_report_agent(company_name: str, industry: str) -> Agent:
+def create_research_analysis_agent(company_name: str, industry: str, memory: bool = False) -> "Agent":
+    """
+    Create combined Research & Analysis Agent for small jobs
+    
+    Used when a single competitor is analyzed at quick depth, where a separate
+    analysis agent would only add coordination round-trips
+    
+    Args:
+        company_name: Name of the company being analyzed
+        industry: Industry sector
+        memory: Whether the agent keeps memory
+        
+    Returns:
+        Agent: Configured research & analysis agent
+    """
+    logger.info(f"Creating Research & Analysis Agent for {company_name} in {industry}")
+    
+    role = config.RESEARCH_ANALYSIS_AGENT_ROLE
+    
+    goal = f"""{_build_goal("research", company_name, industry)}
+{_build_goal("analysis", company_name, industry)}"""
+    
+    backstory = f"{config.RESEARCH_AGENT_BACKSTORY} {config.ANALYSIS_AGENT_BACKSTORY}"
+    
+    from crewai import Agent
+    from tools import get_tools
+    
+    agent = Agent(
+        role=role,
+        goal=goal,
+        backstory=backstory,
+        tools=_research_tools() + [get_tools()["data"]],
+        llm=create_llm(temperature=0.5),
+        verbose=True,
+        allow_delegation=False,
+        max_iter=3,
+        memory=memory
+    )
+    
+    logger.info("Research & Analysis Agent created successfully")
+    return agent
+
+
+def create_report_agent(company_name: str, industry: str, memory: bool = False) -> "Agent":
     """
     Create Report Agent - Specialist in synthesizing insights and recommendations
     
     Args:
         company_name: Name of the company being analyzed
         industry: Industry sector
+        memory: Whether the agent keeps memory (only worthwhile for deep analysis)
         
     Returns:
         Agent: Configured report agent
@@ -123,13 +264,12 @@ def create_report_agent(company_name: str, industry: str) -> Agent:
     
     role = config.REPORT_AGENT_ROLE
     
-    goal = config.REPORT_AGENT_GOAL.format(
-        company_name=company_name,
-        industry=industry
-    )
+    goal = _build_goal("report", company_name, industry)
     
     backstory = config.REPORT_AGENT_BACKSTORY
     
+    from crewai import Agent
+    
     agent = Agent(
         role=role,
         goal=goal,
@@ -139,31 +279,79 @@ def create_report_agent(company_name: str, industry: str) -> Agent:
         verbose=True,
         allow_delegation=False,
         max_iter=10,
-        memory=True
+        memory=memory
     )
     
     logger.info("Report Agent created successfully")
     return agent
 
 
-def create_all_agents(company_name: str, industry: str) -> dict:
+def create_all_agents(company_name: str, industry: str, analysis_depth: str = "standard") -> dict:
     """
     Create all three agents for the competitor analysis system
     
     Args:
         company_name: Name of the company being analyzed
         industry: Industry sector
+        analysis_depth: Depth of analysis, which decides whether memory is enabled
         
     Returns:
         dict: Dictionary containing all three agents
     """
     logger.info(f"Creating all agents for {company_name} in {industry}")
     
+    memory = config.memory_enabled(analysis_depth)
+    
     agents = {
-        "research": create_research_agent(company_name, industry),
-        "analysis": create_analysis_agent(company_name, industry),
-        "report": create_report_agent(company_name, industry)
+        "research": create_research_agent(company_name, industry, memory),
+        "analysis": create_analysis_agent(company_name, industry, memory),
+        "report": create_report_agent(company_name, industry, memory)
     }
     
     logger.info("All agents created successfully")
     return agents
+
+
+def create_agents_for(company_name: str, industry: str, analysis_depth: str, num_competitors: int) -> dict:
+    """
+    Create a crew sized to the job, based on ANALYSIS_DEPTH_CONFIG
+    
+    Agents are built fresh for every crew, since CrewAI agents carry
+    per-execution state; only the LLM and HTTP clients behind them are shared.
+    
+    - quick depth with one competitor: research and analysis share one agent
+    - deep depth: one specialist research agent per competitor, cycling
+      through config.RESEARCH_SPECIALTIES
+    - otherwise: the standard three agents
+    
+    Args:
+        company_name: Name of the company being analyzed
+        industry: Industry sector
+        analysis_depth: Depth of analysis (quick/standard/deep)
+        num_competitors: Number of competitors to analyze
+        
+    Returns:
+        dict: Agents keyed by role; "researchers" holds per-competitor agents when used
+    """
+    depth_config = config.ANALYSIS_DEPTH_CONFIG[analysis_depth]
+    memory = config.memory_enabled(analysis_depth)
+    
+    if depth_config["merge_research_analysis"] and num_competitors == 1:
+        logger.info(f"Creating merged crew for {company_name} in {industry}")
+        research_analysis = create_research_analysis_agent(company_name, industry, memory)
+        return {
+            "research": research_analysis,
+            "analysis": research_analysis,
+            "report": create_report_agent(company_name, industry, memory)
+        }
+    
+    agents = create_all_agents(company_name, industry, analysis_depth)
+    
+    if depth_config["specialist_researchers"]:
+        logger.info(f"Creating {num_competitors} specialist research agents")
+        agents["researchers"] = [
+            create_research_agent(company_name, industry, memory, focus=focus)
+            for focus in islice(cycle(config.RESEARCH_SPECIALTIES), num_competitors)
+        ]
+    
+    return agents
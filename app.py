@@ -3,15 +3,14 @@ Main Streamlit Application for Competitor Analysis System
 Multi-agent system powered by CrewAI for automated competitor analysis
 """
 
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import streamlit as st
 import logging
 from datetime import datetime
-from crewai import Crew, Process
 import config
-from agents import create_all_agents
-from tasks import create_all_tasks
 from utils import (
-    PDFReportGenerator,
     format_report_for_display,
     extract_key_metrics,
     generate_filename
@@ -29,18 +28,71 @@ st.set_page_config(
 logger = logging.getLogger(__name__)
 
 
+def get_agents(company_name: str, industry: str, analysis_depth: str, num_competitors: int) -> dict:
+    """Build a fresh agent set for one run; the LLM clients behind it are shared"""
+    from agents import create_agents_for
+    
+    return create_agents_for(company_name, industry, analysis_depth, num_competitors)
+
+
+@st.cache_resource(show_spinner=False)
+def get_pdf_pool() -> ThreadPoolExecutor:
+    """Process-wide pool for PDF layout, which is CPU-bound and kept off the script thread"""
+    return ThreadPoolExecutor(max_workers=2, thread_name_prefix="pdf")
+
+
+def build_pdf(company_name: str, industry: str, report_content: str) -> bytes:
+    """
+    Render the report PDF on a pool thread
+    
+    Not st.cache_data: pool threads have no script run context. The session
+    keeps the finished future, so repeat downloads reuse its bytes.
+    """
+    from utils import PDFReportGenerator
+    
+    pdf_generator = PDFReportGenerator(company_name, industry)
+    return pdf_generator.generate_pdf(report_content).getvalue()
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def get_report_metrics(report_content: str) -> dict:
+    """Extract summary metrics once per report instead of on every rerun"""
+    return extract_key_metrics(report_content)
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def get_report_sections(report_content: str) -> dict:
+    """Split the report into display sections once per report"""
+    return format_report_for_display(report_content)
+
+
+def _warm_openai():
+    """Import the agent stack and pre-connect to OpenAI off the script thread"""
+    from agents import warm_openai_connection, awarm_openai_connection
+    from pipeline import submit
+    
+    submit(awarm_openai_connection())
+    warm_openai_connection()
+
+
 def initialize_session_state():
     """Initialize Streamlit session state variables"""
     if 'analysis_complete' not in st.session_state:
         st.session_state.analysis_complete = False
-    if 'report_content' not in st.session_state:
-        st.session_state.report_content = None
+    if 'report_content_bytes' not in st.session_state:
+        st.session_state.report_content_bytes = None
     if 'company_name' not in st.session_state:
         st.session_state.company_name = ""
     if 'industry' not in st.session_state:
         st.session_state.industry = ""
     if 'analysis_running' not in st.session_state:
         st.session_state.analysis_running = False
+    if 'batch_jobs' not in st.session_state:
+        st.session_state.batch_jobs = {}
+    if 'pdf_future' not in st.session_state:
+        st.session_state.pdf_future = None
+    if 'partial_results' not in st.session_state:
+        st.session_state.partial_results = {}
 
 
 def validate_api_keys():
@@ -109,6 +161,12 @@ def render_sidebar():
             help="Choose the depth of analysis"
         )
         
+        use_batch_api = st.checkbox(
+            "Use OpenAI Batch API",
+            value=False,
+            help="Run per-competitor SWOT analysis at ~50% cost; results can take much longer to arrive"
+        )
+        
         st.markdown("---")
         
         # Action Button
@@ -123,9 +181,9 @@ def render_sidebar():
         if start_analysis:
             if not company_name or not industry:
                 st.error("Please fill in all required fields (*)")
-                return None, None, None, None
+                return None, None, None, None, False
             
-            return company_name, industry, num_competitors, analysis_depth
+            return company_name, industry, num_competitors, analysis_depth, use_batch_api
         
         # Info section
         if st.session_state.analysis_running:
@@ -140,7 +198,7 @@ def render_sidebar():
         - 📝 Generate strategic insights
         """)
         
-        return None, None, None, None
+        return None, None, None, None, False
 
 
 def render_welcome_screen():
@@ -192,16 +250,20 @@ def render_welcome_screen():
         st.write("Strategic recommendations you can use")
 
 
-def run_competitor_analysis(company_name: str, industry: str, num_competitors: int, analysis_depth: str):
+def run_competitor_analysis(company_name: str, industry: str, num_competitors: int, analysis_depth: str,
+                            use_batch_api: bool = False):
     """
-    Execute the competitor analysis using CrewAI
+    Execute the competitor analysis using CrewAI, researching competitors in parallel
     
     Args:
         company_name: Name of the company to analyze
         industry: Industry sector
         num_competitors: Number of competitors to analyze
         analysis_depth: Depth of analysis (quick/standard/deep)
+        use_batch_api: Route per-competitor SWOT prompts through the OpenAI Batch API
     """
+    from pipeline import run_parallel, submit
+    
     try:
         st.session_state.analysis_running = True
         st.session_state.company_name = company_name
@@ -221,41 +283,63 @@ def run_competitor_analysis(company_name: str, industry: str, num_competitors: i
             status_text.text("🤖 Initializing AI agents...")
             progress_bar.progress(10)
             
-            agents = create_all_agents(company_name, industry)
+            agents = get_agents(company_name, industry, analysis_depth, num_competitors)
             logger.info("Agents created successfully")
             
-            # Step 2: Create Tasks
-            status_text.text("📋 Creating analysis tasks...")
-            progress_bar.progress(20)
-            
-            tasks = create_all_tasks(agents, company_name, industry, num_competitors)
-            logger.info("Tasks created successfully")
+            # Step 2: Run research in parallel, then analysis and report.
+            # The pipeline runs on a background loop; status updates and
+            # report tokens are relayed through a queue and rendered from
+            # this script thread
+            updates = queue.Queue()
+            report_placeholder = st.empty()
             
-            # Step 3: Create Crew
-            status_text.text("👥 Assembling crew...")
-            progress_bar.progress(30)
+            # Resume from checkpointed phases if the previous attempt failed
+            job = (company_name, industry, num_competitors, analysis_depth)
+            if st.session_state.partial_results.get("job") != job:
+                st.session_state.partial_results = {"job": job}
+            state = st.session_state.partial_results
+            state["batch_jobs"] = st.session_state.batch_jobs
+            report_chunks = []
             
-            crew = Crew(
-                agents=list(agents.values()),
-                tasks=tasks,
-                process=Process.sequential,
-                verbose=True
-            )
-            logger.info("Crew assembled successfully")
-            
-            # Step 4: Execute Analysis
-            status_text.text("🔎 Research Agent: Discovering competitors...")
-            progress_bar.progress(40)
-            
-            # Execute the crew
             with st.spinner("Analysis in progress... This may take several minutes."):
-                result = crew.kickoff()
+                future = submit(run_parallel(
+                    agents,
+                    company_name,
+                    industry,
+                    num_competitors,
+                    state=state,
+                    on_status=lambda message, progress: updates.put(("status", message, progress)),
+                    use_batch_api=use_batch_api,
+                    on_token=lambda token: updates.put(("token", token)),
+                    analysis_depth=analysis_depth
+                ))
+                
+                while not (future.done() and updates.empty()):
+                    try:
+                        update = updates.get(timeout=0.2)
+                    except queue.Empty:
+                        continue
+                    
+                    if update[0] == "status":
+                        status_text.text(update[1])
+                        progress_bar.progress(update[2])
+                        continue
+                    
+                    # Batch up every token already queued before re-rendering
+                    report_chunks.append(update[1])
+                    while not updates.empty() and updates.queue[0][0] == "token":
+                        report_chunks.append(updates.get_nowait()[1])
+                    report_placeholder.markdown("".join(report_chunks))
+                
+                result = future.result()
             
             progress_bar.progress(100)
             status_text.text("✅ Analysis complete!")
             
-            # Store results
-            st.session_state.report_content = str(result)
+            # Store results (as UTF-8 bytes; decoded only when rendering)
+            st.session_state.report_content_bytes = str(result).encode()
+            st.session_state.pdf_future = None
+            st.session_state.partial_results = {}
             st.session_state.analysis_complete = True
             st.session_state.analysis_running = False
             
@@ -272,20 +356,67 @@ def run_competitor_analysis(company_name: str, industry: str, num_competitors: i
         st.session_state.analysis_running = False
         logger.error(f"Error during analysis: {str(e)}")
         st.error(f"❌ An error occurred during analysis: {str(e)}")
-        st.info("Please check your API keys and try again.")
+        st.info("Please check your API keys and try again. Completed phases are saved, "
+                "so restarting the same analysis resumes where it stopped.")
+
+
+def _render_pdf_export(report_content: str, polling: bool):
+    """
+    PDF button and download, run as a fragment
+    
+    While a render is pending the fragment reruns on a timer; starting or
+    finishing a render reruns the whole page once, which switches the timer
+    on or off, so the rest of the page never waits on the worker.
+    """
+    pdf_future = st.session_state.pdf_future
+    # A finished render is reused; a failed one is retried on the next click
+    reusable = pdf_future is not None and not (pdf_future.done() and pdf_future.exception())
+    if st.button("📄 Download PDF", use_container_width=True) and not reusable:
+        st.session_state.pdf_future = get_pdf_pool().submit(
+            build_pdf,
+            st.session_state.company_name,
+            st.session_state.industry,
+            report_content
+        )
+        st.rerun()
+    
+    if pdf_future is None:
+        return
+    
+    if not pdf_future.done():
+        st.info("⏳ Generating PDF...")
+        return
+    
+    if polling:
+        st.rerun()
+    
+    try:
+        filename = generate_filename(st.session_state.company_name, "pdf")
+        
+        st.download_button(
+            label="💾 Save PDF",
+            data=pdf_future.result(),
+            file_name=filename,
+            mime="application/pdf"
+        )
+        st.success("PDF generated successfully!")
+    except Exception as e:
+        st.error(f"Error generating PDF: {str(e)}")
 
 
 def render_results():
     """Render analysis results in tabs"""
-    if not st.session_state.analysis_complete or not st.session_state.report_content:
+    if not st.session_state.analysis_complete or not st.session_state.report_content_bytes:
         return
     
+    report_content = st.session_state.report_content_bytes.decode()
+    
     st.title(f"📊 Competitor Analysis: {st.session_state.company_name}")
     st.markdown(f"**Industry:** {st.session_state.industry} | **Date:** {datetime.now().strftime('%B %d, %Y')}")
     st.markdown("---")
     
     # Extract metrics for summary
-    metrics = extract_key_metrics(st.session_state.report_content)
+    metrics = get_report_metrics(report_content)
     
     # Metrics row
     col1, col2, col3, col4 = st.columns(4)
@@ -305,7 +436,7 @@ def render_results():
     st.markdown("---")
     
     # Parse report into sections
-    sections = format_report_for_display(st.session_state.report_content)
+    sections = get_report_sections(report_content)
     
     # Create tabs
     tab1, tab2, tab3, tab4 = st.tabs([
@@ -350,34 +481,17 @@ def render_results():
     col1, col2, col3 = st.columns([1, 1, 2])
     
     with col1:
-        # PDF Export
-        if st.button("📄 Download PDF", use_container_width=True):
-            try:
-                with st.spinner("Generating PDF..."):
-                    pdf_generator = PDFReportGenerator(
-                        st.session_state.company_name,
-                        st.session_state.industry
-                    )
-                    pdf_buffer = pdf_generator.generate_pdf(st.session_state.report_content)
-                    
-                    filename = generate_filename(st.session_state.company_name, "pdf")
-                    
-                    st.download_button(
-                        label="💾 Save PDF",
-                        data=pdf_buffer,
-                        file_name=filename,
-                        mime="application/pdf"
-                    )
-                    st.success("PDF generated successfully!")
-            except Exception as e:
-                st.error(f"Error generating PDF: {str(e)}")
+        # PDF Export; polls on its own while the worker renders
+        pdf_future = st.session_state.pdf_future
+        pending = pdf_future is not None and not pdf_future.done()
+        st.fragment(_render_pdf_export, run_every=0.5 if pending else None)(report_content, pending)
     
     with col2:
         # Text Export
         filename = generate_filename(st.session_state.company_name, "txt")
         st.download_button(
             label="📝 Download Text",
-            data=st.session_state.report_content,
+            data=st.session_state.report_content_bytes,
             file_name=filename,
             mime="text/plain",
             use_container_width=True
@@ -387,7 +501,8 @@ def render_results():
     st.markdown("---")
     if st.button("🔄 Start New Analysis", use_container_width=False):
         st.session_state.analysis_complete = False
-        st.session_state.report_content = None
+        st.session_state.report_content_bytes = None
+        st.session_state.pdf_future = None
         st.rerun()
 
 
@@ -400,8 +515,13 @@ def main():
     if not validate_api_keys():
         return
     
+    # Pre-connect to OpenAI while the user fills in the sidebar form
+    if not st.session_state.get('_warmed'):
+        st.session_state._warmed = True
+        threading.Thread(target=_warm_openai, daemon=True).start()
+    
     # Render sidebar and get inputs
-    company_name, industry, num_competitors, analysis_depth = render_sidebar()
+    company_name, industry, num_competitors, analysis_depth, use_batch_api = render_sidebar()
     
     # Main content area
     if st.session_state.analysis_complete:
@@ -409,7 +529,7 @@ def main():
         render_results()
     elif company_name and industry:
         # Run analysis
-        run_competitor_analysis(company_name, industry, num_competitors, analysis_depth)
+        run_competitor_analysis(company_name, industry, num_competitors, analysis_depth, use_batch_api)
     else:
         # Show welcome screen
         render_welcome_screen()
@@ -3,8 +3,11 @@ Configuration module for Competitor Analysis System
 Handles environment variables, constants, and logging setup
 """
 
+import importlib.util
 import os
 import logging
+import string
+from functools import cache
 from typing import Dict, List
 from dotenv import load_dotenv
 
@@ -15,12 +18,36 @@ load_dotenv()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4-turbo-preview")
 SERPAPI_API_KEY = os.getenv("SERPAPI_API_KEY", "")
+SERPAPI_CONCURRENCY = int(os.getenv("SERPAPI_CONCURRENCY", "10"))
+SERPAPI_RPS = float(os.getenv("SERPAPI_RPS", "5"))  # 0 disables the rate limit
+SERPAPI_BURST = int(os.getenv("SERPAPI_BURST", "5"))
+SEARCH_MAX_WORKERS = int(os.getenv("SEARCH_MAX_WORKERS", "8"))
+SERPAPI_ASYNC_POLL_DELAY = float(os.getenv("SERPAPI_ASYNC_POLL_DELAY", "0.5"))
+SERPAPI_ASYNC_TIMEOUT = float(os.getenv("SERPAPI_ASYNC_TIMEOUT", "60"))
+SERP_CACHE_ENABLED = os.getenv("SERP_CACHE_ENABLED", "true").lower() == "true"
+SERP_CACHE_DIR = os.getenv("SERP_CACHE_DIR", ".serp_cache")
+SERP_CACHE_TTL = int(os.getenv("SERP_CACHE_TTL", str(24 * 60 * 60)))
+SERP_MEMORY_CACHE_SIZE = int(os.getenv("SERP_MEMORY_CACHE_SIZE", "2048"))
+SERP_NEGATIVE_TTL = int(os.getenv("SERP_NEGATIVE_TTL", "60"))  # seconds; 0 disables
+SERP_NEGATIVE_CACHE_SIZE = int(os.getenv("SERP_NEGATIVE_CACHE_SIZE", "512"))
+# Serve the company info, pricing and review tools from one shared search
+FUSED_COMPANY_PROBE = os.getenv("FUSED_COMPANY_PROBE", "true").lower() == "true"
+
+# LLM Response Cache
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".llm_cache.db")
 
 # Application Settings
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 MAX_COMPETITORS = int(os.getenv("MAX_COMPETITORS", "5"))
 DEFAULT_COMPETITORS = int(os.getenv("DEFAULT_COMPETITORS", "3"))
 ANALYSIS_DEPTH = os.getenv("ANALYSIS_DEPTH", "standard")
+MAX_PARALLEL_AGENTS = int(os.getenv("MAX_PARALLEL_AGENTS", "3"))
+
+# OpenAI Batch API Settings
+BATCH_POLL_INITIAL_DELAY = float(os.getenv("BATCH_POLL_INITIAL_DELAY", "5"))
+BATCH_POLL_MAX_DELAY = float(os.getenv("BATCH_POLL_MAX_DELAY", "60"))
+BATCH_POLL_TIMEOUT = float(os.getenv("BATCH_POLL_TIMEOUT", "3600"))
 
 # Industry Categories
 INDUSTRIES = [
@@ -47,27 +74,60 @@ ANALYSIS_DEPTH_CONFIG: Dict[str, Dict] = {
         "description": "Basic competitor overview (5-10 min)",
         "max_search_results": 5,
         "detail_level": "high-level",
-        "research_iterations": 1
+        "research_iterations": 1,
+        "memory": False,
+        "merge_research_analysis": True,
+        "specialist_researchers": False
     },
     "standard": {
         "description": "Comprehensive analysis (10-20 min)",
         "max_search_results": 10,
         "detail_level": "detailed",
-        "research_iterations": 2
+        "research_iterations": 2,
+        "memory": False,
+        "merge_research_analysis": False,
+        "specialist_researchers": False
     },
     "deep": {
         "description": "In-depth strategic analysis (20-30 min)",
         "max_search_results": 15,
         "detail_level": "comprehensive",
-        "research_iterations": 3
+        "research_iterations": 3,
+        "memory": True,
+        "merge_research_analysis": False,
+        "specialist_researchers": True
     }
 }
 
+# Crew memory embeds locally on CPU instead of calling the OpenAI embeddings API
+MEMORY_EMBEDDER: Dict = {
+    "provider": "huggingface",
+    "config": {"model": "sentence-transformers/all-MiniLM-L6-v2"}
+}
+
+
+@cache
+def _memory_embedder_available() -> bool:
+    """Whether the optional sentence-transformers package is installed"""
+    if importlib.util.find_spec("sentence_transformers") is not None:
+        return True
+    
+    logger.warning(
+        "sentence-transformers is not installed; running without agent memory. "
+        "Install it to enable memory for deep analysis."
+    )
+    return False
+
+
+def memory_enabled(analysis_depth: str) -> bool:
+    """Whether agents and crews keep memory at this depth (needs sentence-transformers)"""
+    return ANALYSIS_DEPTH_CONFIG[analysis_depth]["memory"] and _memory_embedder_available()
+
 # Agent Prompts Templates
 RESEARCH_AGENT_ROLE = "Competitor Research Specialist"
-RESEARCH_AGENT_GOAL = """Discover and gather comprehensive data on competitors in the {industry} industry.
-Focus on finding accurate, up-to-date information about {company_name}'s main competitors including their 
-market position, products/services, pricing strategies, and customer sentiment."""
+RESEARCH_AGENT_GOAL_TMPL = string.Template("""Discover and gather comprehensive data on competitors in the ${industry} industry.
+Focus on finding accurate, up-to-date information about ${company_name}'s main competitors including their 
+market position, products/services, pricing strategies, and customer sentiment.""")
 
 RESEARCH_AGENT_BACKSTORY = """You are an expert market researcher with over 15 years of experience in competitive 
 intelligence gathering. You excel at finding reliable information from multiple sources, validating data accuracy, 
@@ -75,25 +135,97 @@ and identifying key differentiators in competitive landscapes. Your research has
 understand their market position and make strategic decisions."""
 
 ANALYSIS_AGENT_ROLE = "Market Analysis Expert"
-ANALYSIS_AGENT_GOAL = """Analyze the competitive landscape for {company_name} in the {industry} industry.
+ANALYSIS_AGENT_GOAL_TMPL = string.Template("""Analyze the competitive landscape for ${company_name} in the ${industry} industry.
 Perform SWOT analysis, identify competitive advantages and weaknesses, compare features and pricing,
-and assess market positioning for each competitor."""
+and assess market positioning for each competitor.""")
 
 ANALYSIS_AGENT_BACKSTORY = """You are a strategic business analyst with an MBA and 20 years of experience in 
 competitive analysis across multiple industries. You have a keen eye for identifying market trends, competitive 
 advantages, and strategic opportunities. Your analysis frameworks have been used by Fortune 500 companies to 
 refine their competitive strategies."""
 
+RESEARCH_ANALYSIS_AGENT_ROLE = "Competitor Research & Analysis Specialist"
+
+# Focus areas for specialist research agents (one per competitor in deep analysis)
+RESEARCH_SPECIALTIES: Dict[str, str] = {
+    "tech": "You focus on products, features, technology stack, and product roadmap.",
+    "business": "You focus on business model, pricing strategy, funding, and market position.",
+    "reviews": "You focus on customer reviews, sentiment, and brand perception."
+}
+
 REPORT_AGENT_ROLE = "Business Intelligence Reporter"
-REPORT_AGENT_GOAL = """Synthesize competitive intelligence into a clear, actionable report for {company_name}.
+REPORT_AGENT_GOAL_TMPL = string.Template("""Synthesize competitive intelligence into a clear, actionable report for ${company_name}.
 Create strategic recommendations based on competitor analysis, identify opportunities and threats,
-and present insights in a professional, executive-ready format."""
+and present insights in a professional, executive-ready format.""")
 
 REPORT_AGENT_BACKSTORY = """You are a senior business consultant specializing in transforming complex data into 
 strategic insights. With expertise in management consulting and business intelligence, you create reports that 
 drive executive decision-making. Your recommendations are known for being practical, data-driven, and aligned 
 with business objectives."""
 
+SWOT_PROMPT = """You are a {role}. Using only the research below, perform a SWOT analysis of
+{competitor_name} as a competitor of {company_name} in the {industry} industry.
+
+Return:
+- Strengths (3-5 points)
+- Weaknesses (3-5 points)
+- Opportunities (2-3 points)
+- Threats (2-3 points)
+
+RESEARCH:
+{research}"""
+
+AGENT_GOAL_TEMPLATES: Dict[str, string.Template] = {
+    "research": RESEARCH_AGENT_GOAL_TMPL,
+    "analysis": ANALYSIS_AGENT_GOAL_TMPL,
+    "report": REPORT_AGENT_GOAL_TMPL
+}
+
+# The industry list is fixed, so specialize every goal template per industry
+# up front; only the company name is left to substitute per run
+AGENT_GOAL_TEMPLATES_BY_INDUSTRY: Dict[tuple, string.Template] = {
+    (role, industry): string.Template(template.safe_substitute(industry=industry))
+    for role, template in AGENT_GOAL_TEMPLATES.items()
+    for industry in INDUSTRIES
+}
+
+# Research Planning Prompts (plan -> parallel tool calls -> synthesis)
+MAX_RESEARCH_TOOL_CALLS = int(os.getenv("MAX_RESEARCH_TOOL_CALLS", "8"))
+
+RESEARCH_PLAN_PROMPT = """You are a {role}. {backstory}
+
+Plan every search needed to complete this task in one go:
+{task_description}
+
+Available tools:
+{tool_descriptions}
+
+Respond with only a JSON list of at most {max_calls} tool calls, e.g.
+[{{"tool": "<tool name>", "input": "<tool input>"}}]"""
+
+RESEARCH_SYNTHESIS_PROMPT = """You are a {role}. {backstory}
+
+Complete this task:
+{task_description}
+
+Expected output:
+{expected_output}
+
+Use only the tool results below:
+{tool_results}"""
+
+REPORT_STREAM_PROMPT = """You are a {role}. {backstory}
+
+Your goal: {goal}
+
+{task_description}
+
+COMPETITIVE ANALYSIS:
+{analysis}
+
+Write the report now, following this structure exactly:
+{expected_output}"""
+
 # Search Query Templates
 COMPETITOR_SEARCH_QUERIES: List[str] = [
     "{company_name} competitors {industry}",
@@ -139,6 +271,24 @@ def setup_logging():
     
     return logging.getLogger(__name__)
 
+# LLM Caching
+@cache
+def setup_llm_caching():
+    """
+    Configure a persistent cache for LLM responses
+    
+    Runs once, on first LLM creation, so importing config stays free of the
+    langchain and SQLAlchemy import graph.
+    """
+    if not LLM_CACHE_ENABLED:
+        return
+    
+    from langchain.globals import set_llm_cache
+    from langchain_community.cache import SQLiteCache
+    
+    # Identical prompts (reruns, retries) are served from disk instead of the API
+    set_llm_cache(SQLiteCache(database_path=LLM_CACHE_PATH))
+
 # Validation Functions
 def validate_config() -> tuple[bool, str]:
     """Validate required configuration"""
@@ -0,0 +1,490 @@
+"""
+Parallel execution pipeline for Competitor Analysis System
+Discovers competitors, researches each one concurrently with planned tool
+fan-out, fans the aggregated research into the Analysis crew, and streams
+the final report
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import threading
+from concurrent.futures import Future
+from typing import Callable, Coroutine, Dict, List, Optional
+import openai
+from crewai import Crew, Process
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
+import config
+from agents import create_async_openai_client, create_llm
+from tasks import (
+    create_discovery_task,
+    create_competitor_research_task,
+    create_analysis_task,
+    create_report_task
+)
+
+try:
+    import orjson
+except ImportError:  # fall back to the (slower) stdlib codec
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+_BATCH_TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+# Markdown code fences the planner may wrap its JSON in
+_CODE_FENCE_RE = re.compile(r'^```(?:json)?\s*|\s*```$')
+
+# Leading list markers the discovery agent may emit despite instructions
+_LIST_MARKER_RE = re.compile(r'^\s*(?:[-*•]|\d+[.)])\s*')
+
+StatusCallback = Callable[[str, int], None]
+TokenCallback = Callable[[str], None]
+
+# Transient OpenAI failures are retried per call instead of failing the run
+_llm_retry = retry(
+    wait=wait_exponential(min=1, max=30),
+    stop=stop_after_attempt(5),
+    retry=retry_if_exception_type((openai.RateLimitError, openai.APITimeoutError, openai.APIConnectionError)),
+    reraise=True
+)
+
+# The shared async HTTP client in agents.py is bound to the loop it first runs
+# on, so every pipeline run is scheduled on one long-lived background loop
+_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_LOOP_LOCK = threading.Lock()
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """Return the background event loop, starting it on first use"""
+    global _LOOP
+    with _LOOP_LOCK:
+        if _LOOP is None:
+            _LOOP = asyncio.new_event_loop()
+            threading.Thread(target=_LOOP.run_forever, name="pipeline-loop", daemon=True).start()
+    return _LOOP
+
+
+def submit(coro: Coroutine) -> Future:
+    """Schedule a pipeline coroutine on the background loop"""
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop())
+
+
+def run_crew_parallel(crew: Crew, inputs_list: List[dict]) -> list:
+    """
+    Run one crew against many input sets (e.g. many companies) concurrently
+
+    CrewAI copies the crew for each input set and interpolates the inputs into
+    its task descriptions, so the crew's tasks should use {placeholders}.
+
+    Args:
+        crew: Crew to run
+        inputs_list: One inputs dict per run
+
+    Returns:
+        list: Crew outputs in the same order as inputs_list
+    """
+    return submit(crew.kickoff_for_each_async(inputs_list)).result()
+
+
+def _loads(data: str):
+    """Parse JSON text, with orjson when available"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _dumps_bytes(data) -> bytes:
+    """Serialize to compact JSON bytes, with orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+@_llm_retry
+async def _ainvoke(llm, prompt: str):
+    """Invoke an LLM asynchronously, retrying transient API errors"""
+    return await llm.ainvoke(prompt)
+
+
+@_llm_retry
+async def _abatch(llm, prompts: List[str], max_concurrency: int) -> list:
+    """Batch-invoke an LLM asynchronously, retrying transient API errors"""
+    return await llm.abatch(prompts, config={"max_concurrency": max_concurrency})
+
+
+def _parse_competitor_names(text: str, limit: int) -> List[str]:
+    """Turn the discovery task output into a clean list of competitor names"""
+    names = []
+
+    for line in text.splitlines():
+        name = _LIST_MARKER_RE.sub('', line).strip().strip('*').strip()
+        if name and name not in names:
+            names.append(name)
+
+    return names[:limit]
+
+
+def _format_research_findings(research: Dict[str, str]) -> str:
+    """Aggregate per-competitor research into a single context blob"""
+    return "\n\n".join(
+        f"### {competitor}\n{findings}" for competitor, findings in research.items()
+    )
+
+
+# Default research plan: the probe covers info, pricing and reviews in one call
+_DEFAULT_PLAN_TOOLS = ("Competitor Probe Tool", "Competitor Profile Tool")
+
+
+def _parse_research_plan(text: str, tools: dict, competitor_name: str) -> List[tuple]:
+    """Parse the planner's JSON tool calls, falling back to a default plan"""
+    try:
+        plan = _loads(_CODE_FENCE_RE.sub('', text.strip()))
+        calls = [
+            (call["tool"], str(call["input"]))
+            for call in plan
+            if isinstance(call, dict) and call.get("tool") in tools and call.get("input")
+        ]
+    except (ValueError, TypeError, KeyError):
+        calls = []
+
+    if not calls:
+        logger.warning(f"Unusable research plan for {competitor_name}; using default plan")
+        preferred = [name for name in _DEFAULT_PLAN_TOOLS if name in tools]
+        calls = [
+            (name, competitor_name)
+            for name in preferred or [name for name in tools if name != "Competitor Search Tool"]
+        ]
+
+    return calls[:config.MAX_RESEARCH_TOOL_CALLS]
+
+
+async def _call_tool(tool, tool_input: str) -> str:
+    """Await a tool's async implementation when it has one, else run it in a thread"""
+    arun = getattr(tool, "_arun", None)
+    if arun is not None:
+        return await arun(tool_input)
+    return await asyncio.to_thread(tool.run, tool_input)
+
+
+async def _research_competitor(semaphore: asyncio.Semaphore, agent, company_name: str,
+                               industry: str, competitor_name: str) -> str:
+    """
+    Research one competitor with a plan -> parallel tools -> synthesis pipeline
+
+    Instead of a free-form tool loop (one LLM round-trip per tool call), the
+    agent plans all searches in one call, the tools run concurrently, and a
+    single call synthesizes the results.
+    """
+    async with semaphore:
+        logger.info(f"Researching competitor: {competitor_name}")
+
+        task = create_competitor_research_task(agent, company_name, industry, competitor_name)
+        tools = {tool.name: tool for tool in agent.tools}
+
+        # 1. Plan every tool call up front
+        plan_output = await _ainvoke(agent.llm, config.RESEARCH_PLAN_PROMPT.format(
+            role=agent.role,
+            backstory=agent.backstory,
+            task_description=task.description,
+            tool_descriptions="\n".join(f"- {name}: {tool.description}" for name, tool in tools.items()),
+            max_calls=config.MAX_RESEARCH_TOOL_CALLS
+        ))
+        plan = _parse_research_plan(plan_output.content, tools, competitor_name)
+
+        # 2. Execute the planned tool calls concurrently
+        outputs = await asyncio.gather(
+            *[_call_tool(tools[name], tool_input) for name, tool_input in plan],
+            return_exceptions=True
+        )
+        tool_results = "\n\n".join(
+            f"[{name}] {tool_input}\n{output}"
+            for (name, tool_input), output in zip(plan, outputs)
+            if not isinstance(output, Exception)
+        )
+
+        # 3. Synthesize the research profile in one call
+        synthesis = await _ainvoke(agent.llm, config.RESEARCH_SYNTHESIS_PROMPT.format(
+            role=agent.role,
+            backstory=agent.backstory,
+            task_description=task.description,
+            expected_output=task.expected_output,
+            tool_results=tool_results
+        ))
+
+        logger.info(f"Research complete for competitor: {competitor_name}")
+        return synthesis.content
+
+
+def _build_swot_prompts(company_name: str, industry: str, research: Dict[str, str]) -> List[str]:
+    """Build one SWOT prompt per competitor, in research order"""
+    return [
+        config.SWOT_PROMPT.format(
+            role=config.ANALYSIS_AGENT_ROLE,
+            competitor_name=competitor,
+            company_name=company_name,
+            industry=industry,
+            research=findings
+        )
+        for competitor, findings in research.items()
+    ]
+
+
+async def _analyze_swots(company_name: str, industry: str, research: Dict[str, str]) -> Dict[str, str]:
+    """Run one SWOT prompt per competitor as a single concurrent LLM batch"""
+    prompts = _build_swot_prompts(company_name, industry, research)
+
+    llm = create_llm(temperature=0.4)
+    responses = await _abatch(llm, prompts, config.MAX_PARALLEL_AGENTS)
+
+    return {
+        competitor: response.content
+        for competitor, response in zip(research, responses)
+    }
+
+
+async def _analyze_swots_batch(company_name: str, industry: str, research: Dict[str, str],
+                               batch_jobs: dict) -> Dict[str, str]:
+    """
+    Run the SWOT prompts through the OpenAI Batch API at reduced cost
+
+    Submitted batch ids are recorded in batch_jobs keyed by a hash of the
+    prompts, so a rerun with the same research resumes polling the existing
+    batch instead of paying for a new one.
+    """
+    prompts = _build_swot_prompts(company_name, industry, research)
+    client = create_async_openai_client()
+
+    jobs_key = hashlib.sha256("\n".join(prompts).encode()).hexdigest()
+    batch_id = batch_jobs.get(jobs_key)
+
+    if batch_id is None:
+        requests_jsonl = b"\n".join(
+            _dumps_bytes({
+                "custom_id": f"swot-{index}",
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": config.OPENAI_MODEL,
+                    "temperature": 0.4,
+                    "messages": [{"role": "user", "content": prompt}]
+                }
+            })
+            for index, prompt in enumerate(prompts)
+        )
+        input_file = await client.files.create(
+            file=("swot_batch.jsonl", requests_jsonl),
+            purpose="batch"
+        )
+        batch = await client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        batch_id = batch_jobs[jobs_key] = batch.id
+        logger.info(f"Submitted SWOT batch {batch_id} with {len(prompts)} requests")
+
+    # Poll with exponential backoff until the batch settles
+    delay = config.BATCH_POLL_INITIAL_DELAY
+    elapsed = 0.0
+    batch = await client.batches.retrieve(batch_id)
+    while batch.status not in _BATCH_TERMINAL_STATUSES:
+        if elapsed >= config.BATCH_POLL_TIMEOUT:
+            raise TimeoutError(f"SWOT batch {batch_id} still {batch.status}; rerun to resume polling")
+        await asyncio.sleep(delay)
+        elapsed += delay
+        delay = min(delay * 2, config.BATCH_POLL_MAX_DELAY)
+        batch = await client.batches.retrieve(batch_id)
+
+    if batch.status != "completed" or not batch.output_file_id:
+        batch_jobs.pop(jobs_key, None)
+        raise RuntimeError(f"SWOT batch {batch_id} ended with status '{batch.status}'")
+
+    output = await client.files.content(batch.output_file_id)
+    contents = {}
+    for line in output.text.splitlines():
+        if not line.strip():
+            continue
+        record = _loads(line)
+        body = (record.get("response") or {}).get("body") or {}
+        choices = body.get("choices") or [{}]
+        contents[record["custom_id"]] = choices[0].get("message", {}).get("content", "")
+
+    return {
+        competitor: contents.get(f"swot-{index}", "")
+        for index, competitor in enumerate(research)
+    }
+
+
+async def _stream_report(agent, company_name: str, industry: str, research_findings: str,
+                         analysis: str, on_token: Optional[TokenCallback]) -> str:
+    """Generate the final report token by token, forwarding each chunk to on_token"""
+    task = create_report_task(agent, company_name, industry, context_tasks=[],
+                              research_findings=research_findings)
+    prompt = config.REPORT_STREAM_PROMPT.format(
+        role=agent.role,
+        backstory=agent.backstory,
+        goal=agent.goal,
+        task_description=task.description,
+        analysis=analysis,
+        expected_output=task.expected_output
+    )
+
+    chunks = []
+    async for chunk in agent.llm.astream(prompt):
+        if chunk.content:
+            chunks.append(chunk.content)
+            if on_token:
+                on_token(chunk.content)
+
+    return "".join(chunks)
+
+
+def _crew_memory_options(analysis_depth: str) -> dict:
+    """Crew memory settings for the chosen depth (local embedder when enabled)"""
+    if not config.memory_enabled(analysis_depth):
+        return {"memory": False}
+    return {"memory": True, "embedder": config.MEMORY_EMBEDDER}
+
+
+async def run_parallel(agents: dict, company_name: str, industry: str, num_competitors: int,
+                       state: dict, on_status: Optional[StatusCallback] = None,
+                       use_batch_api: bool = False, on_token: Optional[TokenCallback] = None,
+                       analysis_depth: str = "standard") -> str:
+    """
+    Run the full analysis with per-competitor research executed concurrently
+
+    Args:
+        agents: Dictionary containing the research, analysis, and report agents
+        company_name: Name of the company being analyzed
+        industry: Industry sector
+        num_competitors: Number of competitors to analyze
+        state: Shared state dict that checkpoints each phase's output; phases
+            already present in it are skipped, so a failed run can resume
+        on_status: Optional callback receiving (message, progress percent)
+        use_batch_api: Run the SWOT prompts through the OpenAI Batch API
+        on_token: Optional callback receiving each streamed chunk of the final report
+        analysis_depth: Depth of analysis (quick/standard/deep)
+
+    Returns:
+        str: Final report content
+    """
+    def report_status(message: str, progress: int):
+        if on_status:
+            on_status(message, progress)
+
+    memory_options = _crew_memory_options(analysis_depth)
+
+    # Phase 1: Discover competitors
+    if "competitors" not in state:
+        report_status("🔎 Research Agent: Discovering competitors...", 40)
+
+        discovery_crew = Crew(
+            agents=[agents["research"]],
+            tasks=[create_discovery_task(agents["research"], company_name, industry, num_competitors)],
+            process=Process.sequential,
+            verbose=True,
+            **memory_options
+        )
+        discovery_output = await discovery_crew.kickoff_async()
+
+        competitors = _parse_competitor_names(str(discovery_output), num_competitors)
+        if not competitors:
+            raise ValueError("Research Agent did not identify any competitors")
+
+        state["competitors"] = competitors
+        logger.info(f"Discovered competitors: {', '.join(competitors)}")
+
+    competitors = state["competitors"]
+
+    # Phase 2: Research every competitor concurrently, checkpointing each one
+    research = state.setdefault("research", {})
+    pending = [
+        (index, competitor) for index, competitor in enumerate(competitors)
+        if competitor not in research
+    ]
+
+    if pending:
+        report_status(f"🔎 Research Agent: Researching {len(pending)} competitors in parallel...", 50)
+
+        # Deep analysis assigns one specialist researcher per competitor
+        researchers = agents.get("researchers") or [agents["research"]] * len(competitors)
+        semaphore = asyncio.Semaphore(config.MAX_PARALLEL_AGENTS)
+
+        async def research_and_checkpoint(researcher, competitor: str):
+            research[competitor] = await _research_competitor(
+                semaphore, researcher, company_name, industry, competitor
+            )
+
+        from tools import serpapi_session
+
+        # One aiohttp session for every competitor's searches in this run. Every
+        # task settles before the session closes, so one failure can't pull the
+        # session out from under its siblings, and the rest still checkpoint
+        async with serpapi_session():
+            outcomes = await asyncio.gather(*[
+                research_and_checkpoint(researchers[index], competitor)
+                for index, competitor in pending
+            ], return_exceptions=True)
+
+        for outcome in outcomes:
+            if isinstance(outcome, BaseException):
+                raise outcome
+
+    state["research"] = {competitor: research[competitor] for competitor in competitors}
+
+    # Phase 3: SWOT per competitor, batched across competitors
+    if "swot" not in state:
+        report_status("📊 Analysis Agent: Running SWOT analysis per competitor...", 65)
+
+        if use_batch_api:
+            state["swot"] = await _analyze_swots_batch(
+                company_name,
+                industry,
+                state["research"],
+                state.setdefault("batch_jobs", {})
+            )
+        else:
+            state["swot"] = await _analyze_swots(company_name, industry, state["research"])
+
+    # Phase 4: Fan in to the Analysis crew
+    research_findings = _format_research_findings({
+        competitor: f"{findings}\n\nSWOT ANALYSIS:\n{state['swot'][competitor]}"
+        for competitor, findings in state["research"].items()
+    })
+
+    if agents["analysis"] is agents["research"]:
+        # Merged crew (single competitor): the SWOT already is the analysis
+        state["analysis"] = research_findings
+    elif "analysis" not in state:
+        report_status("📊 Analysis Agent: Comparing competitors...", 75)
+
+        analysis_crew = Crew(
+            agents=[agents["analysis"]],
+            tasks=[create_analysis_task(
+                agents["analysis"],
+                company_name,
+                industry,
+                context_tasks=[],
+                research_findings=research_findings
+            )],
+            process=Process.sequential,
+            verbose=True,
+            **memory_options
+        )
+        state["analysis"] = str(await analysis_crew.kickoff_async())
+
+    # Phase 5: Stream the final report
+    report_status("📝 Report Agent: Writing the report...", 90)
+
+    state["report"] = await _stream_report(
+        agents["report"],
+        company_name,
+        industry,
+        research_findings,
+        state["analysis"],
+        on_token
+    )
+    return state["report"]
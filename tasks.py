@@ -1,37 +1,23 @@
 """
 Task definitions for Competitor Analysis System
-Defines three sequential tasks: Research, Analysis, and Report Generation
+Defines the Research, Analysis, and Report Generation tasks, plus the
+per-competitor discovery and research tasks used by the parallel pipeline
 """
 
 import logging
+from functools import lru_cache
+from string import Template
 from crewai import Task
 import config
 
 logger = logging.getLogger(__name__)
 
-
-def create_research_task(agent, company_name: str, industry: str, num_competitors: int) -> Task:
-    """
-    Create Competitor Research Task
-    
-    This task focuses on discovering and gathering comprehensive data about competitors
-    
-    Args:
-        agent: Research agent to execute the task
-        company_name: Name of the company being analyzed
-        industry: Industry sector
-        num_competitors: Number of competitors to research
-        
-    Returns:
-        Task: Configured research task
-    """
-    logger.info(f"Creating research task for {company_name}")
-    
-    description = f"""
-    Conduct comprehensive competitor research for {company_name} in the {industry} industry.
+# Task prompt templates, parsed once at import; only the substitution runs per task
+_RESEARCH_DESC_TMPL = Template("""
+    Conduct comprehensive competitor research for ${company_name} in the ${industry} industry.
     
     Your objectives:
-    1. Identify the top {num_competitors} direct competitors of {company_name}
+    1. Identify the top ${num_competitors} direct competitors of ${company_name}
     2. For each competitor, gather:
        - Company name and website
        - Brief description and main products/services
@@ -43,19 +29,19 @@ def create_research_task(agent, company_name: str, industry: str, num_competitor
     5. Identify market positioning and brand perception
     
     Use multiple search queries to ensure comprehensive coverage:
-    - "{company_name} competitors {industry}"
-    - "Top companies in {industry}"
-    - "{company_name} alternatives"
-    - "Best {industry} companies 2024"
+    - "${company_name} competitors ${industry}"
+    - "Top companies in ${industry}"
+    - "${company_name} alternatives"
+    - "Best ${industry} companies 2024"
     
     Focus on finding accurate, recent, and relevant information from reliable sources.
     Prioritize official company websites, industry reports, and reputable business publications.
-    """
-    
-    expected_output = f"""
+    """)
+
+_RESEARCH_OUTPUT_TMPL = Template("""
     A detailed research report containing:
     
-    1. COMPETITOR LIST ({num_competitors} competitors):
+    1. COMPETITOR LIST (${num_competitors} competitors):
        For each competitor:
        - Company Name
        - Website URL
@@ -82,37 +68,58 @@ def create_research_task(agent, company_name: str, industry: str, num_competitor
     
     Format the output as structured text with clear sections and bullet points.
     Include sources/links where information was found.
-    """
+    """)
+
+_DISCOVERY_DESC_TMPL = Template("""
+    Identify the top ${num_competitors} direct competitors of ${company_name} in the ${industry} industry.
     
-    task = Task(
-        description=description,
-        expected_output=expected_output,
-        agent=agent
-    )
+    Use multiple search queries to ensure comprehensive coverage:
+    - "${company_name} competitors ${industry}"
+    - "Top companies in ${industry}"
+    - "${company_name} alternatives"
     
-    logger.info("Research task created successfully")
-    return task
+    Only identify the competitors - detailed research on each one happens in a later step.
+    """)
 
+_DISCOVERY_OUTPUT_TMPL = Template("""
+    Exactly ${num_competitors} competitor company names, one per line, with no numbering,
+    bullets, descriptions, or any other text.
+    """)
 
-def create_analysis_task(agent, company_name: str, industry: str, context_tasks: list) -> Task:
-    """
-    Create Competitive Analysis Task
-    
-    This task analyzes the research data to provide strategic insights
-    
-    Args:
-        agent: Analysis agent to execute the task
-        company_name: Name of the company being analyzed
-        industry: Industry sector
-        context_tasks: List of tasks to use as context (research task)
-        
-    Returns:
-        Task: Configured analysis task
-    """
-    logger.info(f"Creating analysis task for {company_name}")
+_COMPETITOR_RESEARCH_DESC_TMPL = Template("""
+    Research ${competitor_name}, a competitor of ${company_name} in the ${industry} industry.
+    
+    Gather:
+    - Company name and website
+    - Brief description and main products/services
+    - Target market and customer base
+    - Key differentiators
+    - Recent news or developments
+    - Pricing information when available
+    - Customer reviews and sentiment indicators
+    - Market positioning and brand perception
     
-    description = f"""
-    Analyze the competitive landscape for {company_name} based on the research data provided.
+    Focus on finding accurate, recent, and relevant information from reliable sources.
+    Prioritize official company websites, industry reports, and reputable business publications.
+    """)
+
+_COMPETITOR_RESEARCH_OUTPUT_TMPL = Template("""
+    A research profile of ${competitor_name} containing:
+    - Website URL
+    - Description (2-3 sentences)
+    - Main Products/Services
+    - Target Market
+    - Key Differentiators
+    - Pricing model and price ranges or tiers
+    - Review highlights, common praise points and complaints, overall sentiment
+    - Market positioning and unique value proposition
+    
+    Format the output as structured text with bullet points.
+    Include sources/links where information was found.
+    """)
+
+_ANALYSIS_DESC_TMPL = Template("""
+    Analyze the competitive landscape for ${company_name} based on the research data provided.
     
     Your objectives:
     1. Perform SWOT analysis for each major competitor:
@@ -139,9 +146,9 @@ def create_analysis_task(agent, company_name: str, industry: str, context_tasks:
        - Areas of intense competition vs. underserved segments
     
     Use analytical frameworks and data-driven insights. Be objective and thorough.
-    """
-    
-    expected_output = f"""
+    """)
+
+_ANALYSIS_OUTPUT = """
     A comprehensive competitive analysis report containing:
     
     1. EXECUTIVE SUMMARY:
@@ -179,37 +186,9 @@ def create_analysis_task(agent, company_name: str, industry: str, context_tasks:
     Format as structured text with clear sections, tables, and bullet points.
     Be specific and reference the research data.
     """
-    
-    task = Task(
-        description=description,
-        expected_output=expected_output,
-        agent=agent,
-        context=context_tasks
-    )
-    
-    logger.info("Analysis task created successfully")
-    return task
-
 
-def create_report_task(agent, company_name: str, industry: str, context_tasks: list) -> Task:
-    """
-    Create Report Generation Task
-    
-    This task synthesizes all insights into an actionable strategic report
-    
-    Args:
-        agent: Report agent to execute the task
-        company_name: Name of the company being analyzed
-        industry: Industry sector
-        context_tasks: List of tasks to use as context (research + analysis tasks)
-        
-    Returns:
-        Task: Configured report task
-    """
-    logger.info(f"Creating report task for {company_name}")
-    
-    description = f"""
-    Create a comprehensive, executive-ready competitor analysis report for {company_name}.
+_REPORT_DESC_TMPL = Template("""
+    Create a comprehensive, executive-ready competitor analysis report for ${company_name}.
     
     Synthesize insights from the research and analysis phases into a strategic report that:
     
@@ -222,7 +201,7 @@ def create_report_task(agent, company_name: str, industry: str, context_tasks: l
     1. Write an executive summary (1-2 paragraphs) that captures the essence of the analysis
     2. Present key findings in a clear, prioritized manner
     3. Provide strategic recommendations based on the competitive analysis
-    4. Identify specific actions {company_name} should consider
+    4. Identify specific actions ${company_name} should consider
     5. Highlight risks and opportunities in the competitive landscape
     
     The report should be:
@@ -231,13 +210,13 @@ def create_report_task(agent, company_name: str, industry: str, context_tasks: l
     - Actionable with clear recommendations
     - Well-structured and easy to navigate
     - Free of jargon and highly readable
-    """
-    
-    expected_output = f"""
-    A complete competitor analysis report for {company_name} with the following structure:
+    """)
+
+_REPORT_OUTPUT_TMPL = Template("""
+    A complete competitor analysis report for ${company_name} with the following structure:
     
-    # COMPETITOR ANALYSIS REPORT: {company_name}
-    Industry: {industry}
+    # COMPETITOR ANALYSIS REPORT: ${company_name}
+    Industry: ${industry}
     Date: [Current Date]
     
     ## EXECUTIVE SUMMARY
@@ -294,20 +273,225 @@ def create_report_task(agent, company_name: str, industry: str, context_tasks: l
     
     ---
     Report Generated by AI-Powered Competitor Analysis System
+    """)
+
+
+@lru_cache(maxsize=256)
+def _render(template: Template, **fields) -> str:
+    """Substitute task fields into a prompt template, memoized for repeated runs"""
+    return template.substitute(**fields)
+
+
+def create_research_task(agent, company_name: str, industry: str, num_competitors: int,
+                         async_execution: bool = False) -> Task:
+    """
+    Create Competitor Research Task
+    
+    This task focuses on discovering and gathering comprehensive data about competitors
+    
+    Args:
+        agent: Research agent to execute the task
+        company_name: Name of the company being analyzed
+        industry: Industry sector
+        num_competitors: Number of competitors to research
+        async_execution: Run in the background; only for crews where a later
+            task consumes the result through its context
+        
+    Returns:
+        Task: Configured research task
+    """
+    logger.debug("Creating research task for %s", company_name)
+    
+    description = _render(_RESEARCH_DESC_TMPL, company_name=company_name, industry=industry,
+                          num_competitors=num_competitors)
+    
+    expected_output = _render(_RESEARCH_OUTPUT_TMPL, num_competitors=num_competitors)
+    
+    task = Task(
+        description=description,
+        expected_output=expected_output,
+        agent=agent,
+        async_execution=async_execution
+    )
+    
+    logger.debug("Research task created successfully")
+    return task
+
+
+def create_discovery_task(agent, company_name: str, industry: str, num_competitors: int) -> Task:
+    """
+    Create Competitor Discovery Task
+    
+    This task only identifies competitor names so that each competitor can then
+    be researched independently and in parallel
+    
+    Args:
+        agent: Research agent to execute the task
+        company_name: Name of the company being analyzed
+        industry: Industry sector
+        num_competitors: Number of competitors to identify
+        
+    Returns:
+        Task: Configured discovery task
     """
+    logger.debug("Creating discovery task for %s", company_name)
+    
+    description = _render(_DISCOVERY_DESC_TMPL, company_name=company_name, industry=industry,
+                          num_competitors=num_competitors)
+    
+    expected_output = _render(_DISCOVERY_OUTPUT_TMPL, num_competitors=num_competitors)
     
     task = Task(
         description=description,
         expected_output=expected_output,
+        agent=agent
+    )
+    
+    logger.debug("Discovery task created successfully")
+    return task
+
+
+def create_competitor_research_task(agent, company_name: str, industry: str, competitor_name: str,
+                                    async_execution: bool = False) -> Task:
+    """
+    Create Single-Competitor Research Task
+    
+    This task gathers data on one competitor and has no dependency on the other
+    competitors, so one instance per competitor can run concurrently
+    
+    Args:
+        agent: Research agent to execute the task
+        company_name: Name of the company being analyzed
+        industry: Industry sector
+        competitor_name: Competitor to research
+        async_execution: Let CrewAI run this task concurrently with its siblings
+        
+    Returns:
+        Task: Configured research task
+    """
+    logger.debug("Creating research task for competitor %s", competitor_name)
+    
+    description = _render(_COMPETITOR_RESEARCH_DESC_TMPL, company_name=company_name, industry=industry,
+                          competitor_name=competitor_name)
+    
+    expected_output = _render(_COMPETITOR_RESEARCH_OUTPUT_TMPL, competitor_name=competitor_name)
+    
+    task = Task(
+        description=description,
+        expected_output=expected_output,
+        agent=agent,
+        async_execution=async_execution
+    )
+    
+    logger.debug("Research task for %s created successfully", competitor_name)
+    return task
+
+
+def create_parallel_research_tasks(agent, company_name: str, industry: str, competitors: list) -> list:
+    """
+    Create one asynchronous research task per competitor
+    
+    CrewAI starts consecutive async tasks together; a following sync task that
+    lists them as context waits for all of them
+    
+    Args:
+        agent: Research agent to execute the tasks
+        company_name: Name of the company being analyzed
+        industry: Industry sector
+        competitors: Competitor names to research
+        
+    Returns:
+        list: One async research task per competitor
+    """
+    logger.debug("Creating %s parallel research tasks for %s", len(competitors), company_name)
+    
+    return [
+        create_competitor_research_task(agent, company_name, industry, competitor, async_execution=True)
+        for competitor in competitors
+    ]
+
+
+def _with_research_findings(description: str, research_findings: str) -> str:
+    """Append research gathered outside the crew to a task description"""
+    if not research_findings:
+        return description
+    
+    return f"""{description}
+    RESEARCH FINDINGS:
+    {research_findings}
+    """
+
+
+def create_analysis_task(agent, company_name: str, industry: str, context_tasks: list,
+                         research_findings: str = "") -> Task:
+    """
+    Create Competitive Analysis Task
+    
+    This task analyzes the research data to provide strategic insights
+    
+    Args:
+        agent: Analysis agent to execute the task
+        company_name: Name of the company being analyzed
+        industry: Industry sector
+        context_tasks: List of tasks to use as context (research task)
+        research_findings: Research produced outside this crew (parallel pipeline)
+        
+    Returns:
+        Task: Configured analysis task
+    """
+    logger.debug("Creating analysis task for %s", company_name)
+    
+    description = _render(_ANALYSIS_DESC_TMPL, company_name=company_name)
+    
+    expected_output = _ANALYSIS_OUTPUT
+    
+    task = Task(
+        description=_with_research_findings(description, research_findings),
+        expected_output=expected_output,
         agent=agent,
         context=context_tasks
     )
     
-    logger.info("Report task created successfully")
+    logger.debug("Analysis task created successfully")
     return task
 
 
-def create_all_tasks(agents: dict, company_name: str, industry: str, num_competitors: int) -> list:
+def create_report_task(agent, company_name: str, industry: str, context_tasks: list,
+                       research_findings: str = "") -> Task:
+    """
+    Create Report Generation Task
+    
+    This task synthesizes all insights into an actionable strategic report
+    
+    Args:
+        agent: Report agent to execute the task
+        company_name: Name of the company being analyzed
+        industry: Industry sector
+        context_tasks: List of tasks to use as context (research + analysis tasks)
+        research_findings: Research produced outside this crew (parallel pipeline)
+        
+    Returns:
+        Task: Configured report task
+    """
+    logger.debug("Creating report task for %s", company_name)
+    
+    description = _render(_REPORT_DESC_TMPL, company_name=company_name)
+    
+    expected_output = _render(_REPORT_OUTPUT_TMPL, company_name=company_name, industry=industry)
+    
+    task = Task(
+        description=_with_research_findings(description, research_findings),
+        expected_output=expected_output,
+        agent=agent,
+        context=context_tasks
+    )
+    
+    logger.debug("Report task created successfully")
+    return task
+
+
+def create_all_tasks(agents: dict, company_name: str, industry: str, num_competitors: int,
+                     competitors: list = None) -> list:
     """
     Create all three tasks in proper sequence with dependencies
     
@@ -316,26 +500,36 @@ def create_all_tasks(agents: dict, company_name: str, industry: str, num_competi
         company_name: Name of the company being analyzed
         industry: Industry sector
         num_competitors: Number of competitors to analyze
+        competitors: Known competitor names; when given, research is split
+            into one async task per competitor
         
     Returns:
         list: List of tasks in execution order
     """
-    logger.info(f"Creating all tasks for {company_name}")
+    logger.info("Creating all tasks for %s", company_name)
     
     # Task 1: Research (no dependencies)
-    research_task = create_research_task(
-        agents["research"],
-        company_name,
-        industry,
-        num_competitors
-    )
+    if competitors:
+        research_tasks = create_parallel_research_tasks(
+            agents["research"],
+            company_name,
+            industry,
+            competitors
+        )
+    else:
+        research_tasks = [create_research_task(
+            agents["research"],
+            company_name,
+            industry,
+            num_competitors
+        )]
     
     # Task 2: Analysis (depends on research)
     analysis_task = create_analysis_task(
         agents["analysis"],
         company_name,
         industry,
-        context_tasks=[research_task]
+        context_tasks=research_tasks
     )
     
     # Task 3: Report (depends on research + analysis)
@@ -343,10 +537,11 @@ def create_all_tasks(agents: dict, company_name: str, industry: str, num_competi
         agents["report"],
         company_name,
         industry,
-        context_tasks=[research_task, analysis_task]
+        context_tasks=research_tasks + [analysis_task]
     )
     
-    tasks = [research_task, analysis_task, report_task]
+    tasks = research_tasks + [analysis_task, report_task]
     
     logger.info("All tasks created successfully")
     return tasks
+
@@ -1,58 +1,653 @@
 """
 Custom tools for Competitor Analysis System
-Includes SerpAPI wrapper and data processing utilities
+Includes async SerpAPI wrappers (with sync entry points for CrewAI) and data
+processing utilities
 """
 
 import json
 import time
+import asyncio
 import logging
-from typing import Dict, List, Optional, Any
-from serpapi import GoogleSearch
+import re
+import threading
+import weakref
+from abc import abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from functools import cache
+from itertools import islice
+from operator import itemgetter
+from types import MappingProxyType
+from typing import AsyncIterator, Awaitable, Callable, Coroutine, Dict, List, Mapping, Optional, Any
+import aiohttp
+import diskcache
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from crewai_tools import BaseTool
 from pydantic import Field
 import config
 
+try:
+    import orjson
+except ImportError:  # fall back to the (slower) stdlib encoder
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+SERPAPI_SEARCH_URL = "https://serpapi.com/search.json"
+SERPAPI_ARCHIVE_URL = "https://serpapi.com/searches/{search_id}.json"
+
+# Snippet keyword scans, case-insensitive so snippets needn't be lowercased
+_PRICING_RE = re.compile(r"price|pricing|\$|cost|plan", re.I)
+_REVIEW_RE = re.compile(r"review|rating|customer|feedback", re.I)
+_COMPANY_RE = re.compile(r"founded|headquarter|company|about|overview|official", re.I)
+
+# Field defaults for SERP entries: merge once instead of a .get() per field
+_ORGANIC_DEFAULTS = {"title": "", "link": "", "snippet": "", "position": 0}
+_KNOWLEDGE_GRAPH_DEFAULTS = {"title": "", "type": "", "description": "", "website": ""}
+_snippet_fields = itemgetter("title", "link", "snippet")
+# Shared defaults are only read, never mutated: structured output is dumped at once
+_COMP_TEMPLATE = {"name": "", "website": "", "description": "", "strengths": [], "weaknesses": []}
+
+
+def _dumps(data: Any) -> str:
+    """Serialize tool output compactly; the agent's LLM ignores whitespace"""
+    if orjson is not None:
+        return orjson.dumps(data).decode()
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
+def _loads(data: str) -> Any:
+    """Parse JSON text, with orjson when available"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+# Persistent cache of raw SerpAPI responses, shared by every tool
+_SERP_CACHE = diskcache.Cache(config.SERP_CACHE_DIR) if config.SERP_CACHE_ENABLED else None
+
+# In-process LRU in front of the disk cache: (expires_at, results) per key
+_MEMORY_CACHE: "OrderedDict[tuple, tuple]" = OrderedDict()
+_MEMORY_CACHE_LOCK = threading.Lock()
+
+
+def _serp_cache_key(params: Dict) -> tuple:
+    """Build a cache key from the search params, normalizing the query string"""
+    query = " ".join(params["q"].lower().split())
+    return (params.get("engine", "google"), params.get("num"), query)
+
+
+def _cache_get(params: Dict) -> Optional[Dict]:
+    """Look up a search in the memory LRU, then on disk"""
+    if _SERP_CACHE is None:
+        return None
+    
+    key = _serp_cache_key(params)
+    with _MEMORY_CACHE_LOCK:
+        entry = _MEMORY_CACHE.get(key)
+        if entry is not None:
+            if entry[0] > time.time():
+                _MEMORY_CACHE.move_to_end(key)
+                logger.info("SerpAPI cache hit for: %s", params['q'])
+                return entry[1]
+            del _MEMORY_CACHE[key]
+    
+    results, expires_at = _SERP_CACHE.get(key, expire_time=True)
+    if results is None:
+        return None
+    
+    logger.info("SerpAPI cache hit for: %s", params['q'])
+    _remember(key, results, expires_at or time.time() + config.SERP_CACHE_TTL)
+    return results
+
+
+def _cache_set(params: Dict, results: Dict) -> None:
+    """Store a successful search in both cache tiers"""
+    # Don't pin API errors (quota, bad key, no results); they only go in the
+    # short-lived negative cache
+    if "error" in results:
+        _negative_set(params, results)
+        return
+    
+    if _SERP_CACHE is None:
+        return
+    
+    key = _serp_cache_key(params)
+    _SERP_CACHE.set(key, results, expire=config.SERP_CACHE_TTL)
+    _remember(key, results, time.time() + config.SERP_CACHE_TTL)
+
+
+class SerpAPIError(Exception):
+    """A SerpAPI HTTP error, or a recent failure replayed from the negative cache"""
+
+
+def _check_response(status: int, payload: Any) -> Dict:
+    """
+    Return a SerpAPI JSON body, raising for HTTP errors on either client
+    
+    SerpAPI explains most failures (bad key, exhausted quota) in an "error"
+    field of the error response, so that message is kept in the exception.
+    """
+    if status >= 400:
+        message = payload.get("error") if isinstance(payload, dict) else None
+        raise SerpAPIError(f"HTTP {status}: {message or 'SerpAPI request failed'}")
+    if not isinstance(payload, dict):
+        raise SerpAPIError(f"HTTP {status}: response is not a JSON object")
+    return payload
+
+
+# Recently failed searches: cache key -> (expires_at, error payload or message).
+# Short-lived, so agents stuck retrying a bad query don't re-pay for it; capped
+# like the memory LRU so a stream of distinct failures can't grow it unbounded
+_NEG_CACHE: "OrderedDict[tuple, tuple]" = OrderedDict()
+_NEG_CACHE_LOCK = threading.Lock()
+
+
+def _negative_get(params: Dict) -> Optional[Dict]:
+    """Replay a recent failure: return its error payload, or raise its exception"""
+    key = _serp_cache_key(params)
+    with _NEG_CACHE_LOCK:
+        entry = _NEG_CACHE.get(key)
+        if entry is None:
+            return None
+        
+        expires_at, outcome = entry
+        if expires_at <= time.time():
+            del _NEG_CACHE[key]
+            return None
+    
+    logger.info("SerpAPI negative cache hit for: %s", params['q'])
+    if isinstance(outcome, dict):
+        return outcome
+    raise SerpAPIError(f"cached_failure: {outcome}")
+
+
+def _negative_set(params: Dict, outcome: Any) -> None:
+    """Remember a failed search (error payload or exception) for a short while"""
+    if config.SERP_NEGATIVE_TTL <= 0:
+        return
+    
+    key = _serp_cache_key(params)
+    outcome = outcome if isinstance(outcome, dict) else str(outcome)
+    with _NEG_CACHE_LOCK:
+        _NEG_CACHE[key] = (time.time() + config.SERP_NEGATIVE_TTL, outcome)
+        _NEG_CACHE.move_to_end(key)
+        if len(_NEG_CACHE) > config.SERP_NEGATIVE_CACHE_SIZE:
+            _NEG_CACHE.popitem(last=False)
+
+
+def _remember(key: tuple, results: Dict, expires_at: float) -> None:
+    """Insert into the memory LRU, evicting the least recently used entry"""
+    with _MEMORY_CACHE_LOCK:
+        _MEMORY_CACHE[key] = (expires_at, results)
+        _MEMORY_CACHE.move_to_end(key)
+        if len(_MEMORY_CACHE) > config.SERP_MEMORY_CACHE_SIZE:
+            _MEMORY_CACHE.popitem(last=False)
+
+
+# Process-wide keep-alive pool for blocking searches, so threads reuse TLS connections
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=64,
+    max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=(429, 500, 502, 503, 504),
+                      raise_on_status=False)
+))
+
+
+class _RateLimiter:
+    """Token bucket (GCRA) shared by every thread and event loop in the process"""
+    
+    def __init__(self, rps: float, burst: int = 1):
+        self._interval = 1.0 / rps if rps > 0 else 0.0
+        self._tolerance = self._interval * max(burst - 1, 0)
+        self._tat = 0.0
+        self._lock = threading.Lock()
+    
+    def _reserve(self) -> float:
+        """Claim the next send slot, returning how long to wait for it"""
+        if not self._interval:
+            return 0.0
+        
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._tat - self._tolerance)
+            self._tat = max(self._tat, start) + self._interval
+            return start - now
+    
+    def wait(self) -> None:
+        """Block the calling thread until a request may be sent"""
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+    
+    async def acquire(self) -> None:
+        """Yield to the event loop until a request may be sent"""
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+_RATE_LIMITER = _RateLimiter(config.SERPAPI_RPS, config.SERPAPI_BURST)
+
+# Concurrency cap per event loop; asyncio primitives can't be shared across loops
+_LOOP_SEMAPHORES: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = \
+    weakref.WeakKeyDictionary()
+
+
+def _serpapi_semaphore() -> asyncio.Semaphore:
+    """Return the running loop's SerpAPI concurrency semaphore"""
+    loop = asyncio.get_running_loop()
+    semaphore = _LOOP_SEMAPHORES.get(loop)
+    if semaphore is None:
+        semaphore = _LOOP_SEMAPHORES[loop] = asyncio.Semaphore(config.SERPAPI_CONCURRENCY)
+    return semaphore
+
+
+def _serpapi_call(params: Dict) -> Dict:
+    """Run a blocking SerpAPI search over the shared session"""
+    _RATE_LIMITER.wait()
+    response = _SESSION.get(SERPAPI_SEARCH_URL, params=params, timeout=15)
+    try:
+        payload = response.json()
+    except ValueError:
+        payload = None
+    return _check_response(response.status_code, payload)
+
+
+def _google_search(params: Dict, force_refresh: bool = False) -> Dict:
+    """Run a SerpAPI Google search, served from the cache when possible"""
+    results = None if force_refresh else _cache_get(params) or _negative_get(params)
+    if results is not None:
+        return results
+    
+    try:
+        results = _serpapi_call(params)
+    except Exception as e:
+        _negative_set(params, e)
+        raise
+    
+    _cache_set(params, results)
+    return results
+
+
+# Session opened by the outermost async caller; nested calls (e.g. every query
+# in a batch_search) share its keep-alive connection pool
+_SESSION_VAR: ContextVar[Optional[aiohttp.ClientSession]] = ContextVar("serpapi_session", default=None)
+
+
+@asynccontextmanager
+async def serpapi_session() -> AsyncIterator[aiohttp.ClientSession]:
+    """Reuse the caller's SerpAPI session, or open one for this scope"""
+    session = _SESSION_VAR.get()
+    if session is not None and not session.closed:
+        yield session
+        return
+    
+    connector = aiohttp.TCPConnector(limit=64, limit_per_host=32)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        token = _SESSION_VAR.set(session)
+        try:
+            yield session
+        finally:
+            _SESSION_VAR.reset(token)
+
+
+# Searches on the wire, keyed by (session, cache key), so concurrent identical
+# queries from parallel agents share one request instead of each paying for it.
+# Only callers on the same session join, so a request never outlives the
+# session it runs on
+_INFLIGHT: Dict[tuple, "asyncio.Task"] = {}
+
+
+async def _get_json(session: aiohttp.ClientSession, url: str, params: Dict) -> Dict:
+    """GET a SerpAPI endpoint within the concurrency and rate limits"""
+    async with _serpapi_semaphore():
+        await _RATE_LIMITER.acquire()
+        async with session.get(url, params=params) as response:
+            try:
+                payload = await response.json(content_type=None)
+            except ValueError:
+                payload = None
+            return _check_response(response.status, payload)
+
+
+async def _coalesced(session: aiohttp.ClientSession, params: Dict,
+                     fetch: Callable[[], Awaitable[Dict]]) -> Dict:
+    """Await an identical in-flight search on this session, else start fetch()"""
+    key = (session, _serp_cache_key(params))
+    task = _INFLIGHT.get(key)
+    if task is None:
+        task = asyncio.create_task(fetch())
+        _INFLIGHT[key] = task
+        task.add_done_callback(lambda _: _INFLIGHT.pop(key, None))
+    else:
+        logger.info("Joining in-flight search for: %s", params['q'])
+    
+    # Shielded so one cancelled caller doesn't cancel the search for the others
+    return await asyncio.shield(task)
+
+
+async def _serpapi_get(session: aiohttp.ClientSession, params: Dict,
+                       force_refresh: bool = False) -> Dict:
+    """Run a SerpAPI search without blocking the event loop, using the cache"""
+    results = None if force_refresh else _cache_get(params) or _negative_get(params)
+    if results is not None:
+        return results
+    
+    async def fetch() -> Dict:
+        try:
+            results = await _get_json(session, SERPAPI_SEARCH_URL, params)
+        except Exception as e:
+            _negative_set(params, e)
+            raise
+        
+        _cache_set(params, results)
+        return results
+    
+    return await _coalesced(session, params, fetch)
+
+
+async def _serpapi_get_async_mode(session: aiohttp.ClientSession, params: Dict,
+                                  force_refresh: bool = False) -> Dict:
+    """Submit a search with SerpAPI's async mode, then poll the archive for it"""
+    results = None if force_refresh else _cache_get(params) or _negative_get(params)
+    if results is not None:
+        return results
+    
+    async def fetch() -> Dict:
+        try:
+            return await poll()
+        except Exception as e:
+            _negative_set(params, e)
+            raise
+    
+    async def poll() -> Dict:
+        results = await _get_json(session, SERPAPI_SEARCH_URL, {**params, "async": "true"})
+        
+        metadata = results.get("search_metadata", {})
+        search_id = metadata.get("id")
+        if not search_id:
+            raise SerpAPIError("async search submitted without a search id")
+        
+        archive_url = SERPAPI_ARCHIVE_URL.format(search_id=search_id)
+        delay = config.SERPAPI_ASYNC_POLL_DELAY
+        deadline = time.monotonic() + config.SERPAPI_ASYNC_TIMEOUT
+        
+        # Anything short of a final status ("Queued", "Processing", ...) is polled
+        while metadata.get("status") not in ("Success", "Error"):
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"SerpAPI search {search_id} not ready after {config.SERPAPI_ASYNC_TIMEOUT}s")
+            
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 5)
+            
+            results = await _get_json(session, archive_url, {"api_key": params["api_key"]})
+            metadata = results.get("search_metadata", {})
+        
+        # Only finished searches are pinned; failures go in the negative cache
+        if metadata["status"] == "Success":
+            _cache_set(params, results)
+        else:
+            _negative_set(params, results)
+        return results
+    
+    return await _coalesced(session, params, fetch)
+
+
+def _run_coroutine(coro: Coroutine) -> Any:
+    """Run a coroutine from sync code, even if this thread already runs a loop"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+
+class SerpAPITool(BaseTool):
+    """
+    Base for SerpAPI-backed tools
+    
+    Subclasses describe one search (_params) and how to read it (_extract).
+    CrewAI's synchronous _run goes over the process-wide keep-alive session;
+    _arun shares the caller's aiohttp session.
+    """
+    
+    api_key: str = Field(default=config.SERPAPI_API_KEY)
+    force_refresh: bool = Field(default=False)
+    max_parallel: int = Field(default=config.SERPAPI_CONCURRENCY)
+    
+    @abstractmethod
+    def _params(self, query: str) -> Dict:
+        """Build the SerpAPI params for one tool input"""
+    
+    @abstractmethod
+    def _extract(self, results: Dict, query: str) -> Dict:
+        """Turn a SERP response into the tool's payload"""
+    
+    def _error(self, query: str, error: Exception) -> Dict:
+        """Payload returned to the agent when the search fails"""
+        return {"error": str(error), "query": query}
+    
+    def fetch(self, query: str) -> Dict:
+        """Run the search on the shared blocking session; raises on failure"""
+        return self._extract(_google_search(self._params(query), self.force_refresh), query)
+    
+    async def afetch(self, query: str) -> Dict:
+        """Run the search without blocking the event loop; raises on failure"""
+        async with serpapi_session() as session:
+            results = await _serpapi_get(session, self._params(query), self.force_refresh)
+        return self._extract(results, query)
+    
+    def _run(self, query: str) -> str:
+        """Execute the search for CrewAI's synchronous tool interface"""
+        try:
+            logger.info("%s: %s", self.name, query)
+            return _dumps(self.fetch(query))
+        except Exception as e:
+            logger.error("%s error for '%s': %s", self.name, query, e)
+            return _dumps(self._error(query, e))
+    
+    async def _arun(self, query: str) -> str:
+        """Execute the search asynchronously"""
+        try:
+            logger.info("%s: %s", self.name, query)
+            return _dumps(await self.afetch(query))
+        except Exception as e:
+            logger.error("%s error for '%s': %s", self.name, query, e)
+            return _dumps(self._error(query, e))
+    
+    async def batch_search(self, queries: List[str]) -> List[str]:
+        """Run many searches concurrently over one shared session"""
+        semaphore = asyncio.Semaphore(self.max_parallel)
+        
+        async def search(query: str) -> str:
+            async with semaphore:
+                return await self._arun(query)
+        
+        async with serpapi_session():
+            return await asyncio.gather(*[search(query) for query in queries])
+
+
+class CompanySerpAPITool(SerpAPITool):
+    """
+    Base for SerpAPI tools whose input is a company name
+    
+    CrewAI derives a tool's argument schema from its _run signature, so the
+    entry points are redeclared here to show agents a company_name argument.
+    """
+    
+    def _error(self, company_name: str, error: Exception) -> Dict:
+        """Payload returned to the agent when the search fails"""
+        return {"error": str(error), "company_name": company_name}
+    
+    def _run(self, company_name: str) -> str:
+        """Look up a company for CrewAI's synchronous tool interface"""
+        return super()._run(company_name)
+    
+    async def _arun(self, company_name: str) -> str:
+        """Look up a company asynchronously"""
+        return await super()._arun(company_name)
+
+
+def _company_summary(results: Dict, company_name: str) -> Dict:
+    """Build the company info payload from a SERP response"""
+    # Knowledge graph first, falling back to the top organic result
+    kg = results.get("knowledge_graph") or {}
+    first = (results.get("organic_results") or [{}])[0]
+    
+    return {
+        "name": company_name,
+        "description": kg.get("description") or first.get("snippet", ""),
+        "website": kg.get("website") or first.get("link", ""),
+        "industry": kg.get("industry", ""),
+        "founded": kg.get("founded", ""),
+        "headquarters": kg.get("headquarters", ""),
+        "key_facts": kg.get("key_facts", [])
+    }
+
+
+def _pricing_summary(company_name: str, matches: List[tuple]) -> Dict:
+    """Build the pricing payload from (title, link, snippet) matches"""
+    return {
+        "company_name": company_name,
+        "pricing_found": bool(matches),
+        "pricing_details": [
+            {"source": title, "link": link, "description": snippet}
+            for title, link, snippet in matches
+        ],
+        "sources": [link for _, link, _ in matches]
+    }
+
+
+def _review_summary(company_name: str, matches: List[tuple]) -> Dict:
+    """Build the review payload from (title, link, snippet) matches"""
+    return {
+        "company_name": company_name,
+        "reviews_found": bool(matches),
+        "review_sources": [
+            {"source": title, "link": link, "snippet": snippet}
+            for title, link, snippet in matches
+        ],
+        "sentiment_indicators": []
+    }
+
+
+def _probe_params(company_name: str, api_key: str, num: int = 20) -> Dict:
+    """SerpAPI params for the one broad search behind a fused company probe"""
+    return {
+        "q": f"{company_name} pricing reviews overview",
+        "api_key": api_key,
+        "engine": "google",
+        "num": num
+    }
+
+
+def _probe_payload(results: Dict, company_name: str) -> Dict:
+    """
+    Split one broad SERP response into company info, pricing and reviews
+    
+    Each organic result is classified into the pricing, review and company
+    buckets in a single pass. Concurrent probes of the same company share the
+    request through the cache and in-flight map.
+    
+    Args:
+        results: Response to the _probe_params search
+        company_name: Company being probed
+        
+    Returns:
+        Dict with "company_info", "pricing" and "reviews" payloads
+    """
+    pricing, reviews, about = [], [], []
+    for result in results.get("organic_results") or ():
+        entry = _snippet_fields({**_ORGANIC_DEFAULTS, **result})
+        snippet = entry[2]
+        if _PRICING_RE.search(snippet):
+            pricing.append(entry)
+        if _REVIEW_RE.search(snippet):
+            reviews.append(entry)
+        if _COMPANY_RE.search(snippet):
+            about.append(result)
+    
+    # Company info falls back to the most "about"-like results, not the first hit
+    company_results = {**results, "organic_results": about or results.get("organic_results") or []}
+    
+    return {
+        "company_info": _company_summary(company_results, company_name),
+        "pricing": _pricing_summary(company_name, pricing),
+        "reviews": _review_summary(company_name, reviews)
+    }
+
 
-class CompetitorSearchTool(BaseTool):
+class CompetitorSearchTool(SerpAPITool):
     """Tool for searching competitor information using SerpAPI"""
     
     name: str = "Competitor Search Tool"
     description: str = """Search for competitor information, company details, pricing, and reviews.
     Input should be a search query string. Returns structured information about competitors."""
     
-    api_key: str = Field(default=config.SERPAPI_API_KEY)
     max_results: int = Field(default=10)
     
-    def _run(self, query: str) -> str:
-        """Execute competitor search"""
-        try:
-            logger.info(f"Searching for: {query}")
-            
-            # Execute search
-            params = {
-                "q": query,
-                "api_key": self.api_key,
-                "num": self.max_results,
-                "engine": "google"
-            }
-            
-            search = GoogleSearch(params)
-            results = search.get_dict()
-            
-            # Process results
-            processed_results = self._process_search_results(results)
-            
-            return json.dumps(processed_results, indent=2)
+    def _params(self, query: str) -> Dict:
+        """Build SerpAPI params for a search query"""
+        return {
+            "q": query,
+            "api_key": self.api_key,
+            "num": self.max_results,
+            "engine": "google"
+        }
+    
+    def _extract(self, results: Dict, query: str) -> Dict:
+        """Process the results of a competitor search"""
+        return self._process_search_results(results)
+    
+    def _error(self, query: str, error: Exception) -> Dict:
+        """Failed searches keep the results key agents expect"""
+        return {"error": str(error), "query": query, "results": []}
+    
+    async def arun_many(self, queries: List[str]) -> List[Dict]:
+        """
+        Run several searches as one round: submit all, then poll them together
+        
+        Args:
+            queries: Search query strings
             
-        except Exception as e:
-            logger.error(f"Search error for query '{query}': {str(e)}")
-            return json.dumps({
-                "error": str(e),
-                "query": query,
-                "results": []
-            })
+        Returns:
+            Processed results in query order; failed queries yield an error dict
+        """
+        logger.info("Searching %s queries in SerpAPI async mode", len(queries))
+        
+        semaphore = asyncio.Semaphore(self.max_parallel)
+        
+        async def search(session: aiohttp.ClientSession, query: str) -> Dict:
+            async with semaphore:
+                return await _serpapi_get_async_mode(session, self._params(query), self.force_refresh)
+        
+        async with serpapi_session() as session:
+            responses = await asyncio.gather(
+                *[search(session, query) for query in queries],
+                return_exceptions=True
+            )
+        
+        processed = []
+        for query, results in zip(queries, responses):
+            if isinstance(results, Exception):
+                logger.error("Search error for query '%s': %s", query, results)
+                processed.append({"error": str(results), "query": query, "results": []})
+            else:
+                processed.append(self._process_search_results(results))
+        
+        return processed
+    
+    def run_many(self, queries: List[str]) -> List[Dict]:
+        """Synchronous wrapper around arun_many"""
+        return _run_coroutine(self.arun_many(queries))
     
     def _process_search_results(self, results: Dict) -> Dict:
         """Process and structure search results"""
@@ -62,227 +657,315 @@ class CompetitorSearchTool(BaseTool):
             "related_searches": []
         }
         
+        # One lookup per field; absent or empty fields skip their extraction
+        organic = results.get("organic_results") or ()
+        kg = results.get("knowledge_graph") or {}
+        related = results.get("related_searches") or ()
+        
         # Extract organic results
-        if "organic_results" in results:
-            for result in results["organic_results"][:self.max_results]:
-                processed["organic_results"].append({
-                    "title": result.get("title", ""),
-                    "link": result.get("link", ""),
-                    "snippet": result.get("snippet", ""),
-                    "position": result.get("position", 0)
-                })
+        for result in islice(organic, self.max_results):
+            merged = {**_ORGANIC_DEFAULTS, **result}
+            processed["organic_results"].append({k: merged[k] for k in _ORGANIC_DEFAULTS})
         
         # Extract knowledge graph if available
-        if "knowledge_graph" in results:
-            kg = results["knowledge_graph"]
-            processed["knowledge_graph"] = {
-                "title": kg.get("title", ""),
-                "type": kg.get("type", ""),
-                "description": kg.get("description", ""),
-                "website": kg.get("website", "")
-            }
+        if kg:
+            merged = {**_KNOWLEDGE_GRAPH_DEFAULTS, **kg}
+            processed["knowledge_graph"] = {k: merged[k] for k in _KNOWLEDGE_GRAPH_DEFAULTS}
         
         # Extract related searches
-        if "related_searches" in results:
-            processed["related_searches"] = [
-                rs.get("query", "") for rs in results["related_searches"]
-            ]
+        if related:
+            processed["related_searches"] = [rs.get("query", "") for rs in related]
         
         return processed
 
 
-class CompanyInfoTool(BaseTool):
+class CompanyInfoTool(CompanySerpAPITool):
     """Tool for getting detailed company information"""
     
     name: str = "Company Information Tool"
     description: str = """Get detailed information about a specific company including 
     description, website, industry, and key facts. Input should be the company name."""
     
-    api_key: str = Field(default=config.SERPAPI_API_KEY)
+    def _params(self, company_name: str) -> Dict:
+        """Build SerpAPI params; the fused probe search when enabled"""
+        if config.FUSED_COMPANY_PROBE:
+            return _probe_params(company_name, self.api_key)
+        
+        # Search for company information
+        return {
+            "q": f"{company_name} company information",
+            "api_key": self.api_key,
+            "engine": "google"
+        }
     
-    def _run(self, company_name: str) -> str:
-        """Get company information"""
-        try:
-            logger.info(f"Getting info for company: {company_name}")
-            
-            # Search for company information
-            params = {
-                "q": f"{company_name} company information",
-                "api_key": self.api_key,
-                "engine": "google"
-            }
-            
-            search = GoogleSearch(params)
-            results = search.get_dict()
-            
-            # Extract company info
-            company_info = self._extract_company_info(results, company_name)
-            
-            return json.dumps(company_info, indent=2)
-            
-        except Exception as e:
-            logger.error(f"Error getting company info for '{company_name}': {str(e)}")
-            return json.dumps({
-                "error": str(e),
-                "company_name": company_name
-            })
+    def _extract(self, results: Dict, company_name: str) -> Dict:
+        """Read this tool's payload from the search results"""
+        if config.FUSED_COMPANY_PROBE:
+            return _probe_payload(results, company_name)["company_info"]
+        return self._extract_company_info(results, company_name)
     
     def _extract_company_info(self, results: Dict, company_name: str) -> Dict:
         """Extract structured company information from search results"""
-        info = {
-            "name": company_name,
-            "description": "",
-            "website": "",
-            "industry": "",
-            "founded": "",
-            "headquarters": "",
-            "key_facts": []
-        }
-        
-        # Try to get info from knowledge graph
-        if "knowledge_graph" in results:
-            kg = results["knowledge_graph"]
-            info["description"] = kg.get("description", "")
-            info["website"] = kg.get("website", "")
-            info["founded"] = kg.get("founded", "")
-            info["headquarters"] = kg.get("headquarters", "")
-            
-            # Extract key facts
-            if "key_facts" in kg:
-                info["key_facts"] = kg.get("key_facts", [])
-        
-        # Fallback to organic results for description
-        if not info["description"] and "organic_results" in results:
-            if results["organic_results"]:
-                info["description"] = results["organic_results"][0].get("snippet", "")
-                info["website"] = results["organic_results"][0].get("link", "")
-        
-        return info
+        return _company_summary(results, company_name)
 
 
-class PricingSearchTool(BaseTool):
+class PricingSearchTool(CompanySerpAPITool):
     """Tool for finding pricing information"""
     
     name: str = "Pricing Search Tool"
     description: str = """Search for pricing information for a specific company or product.
     Input should be the company/product name. Returns pricing details if available."""
     
-    api_key: str = Field(default=config.SERPAPI_API_KEY)
+    def _params(self, company_name: str) -> Dict:
+        """Build SerpAPI params; the fused probe search when enabled"""
+        if config.FUSED_COMPANY_PROBE:
+            return _probe_params(company_name, self.api_key)
+        
+        # Search for pricing
+        return {
+            "q": f"{company_name} pricing plans cost",
+            "api_key": self.api_key,
+            "engine": "google",
+            "num": 5
+        }
     
-    def _run(self, company_name: str) -> str:
-        """Search for pricing information"""
-        try:
-            logger.info(f"Searching pricing for: {company_name}")
-            
-            # Search for pricing
-            params = {
-                "q": f"{company_name} pricing plans cost",
-                "api_key": self.api_key,
-                "engine": "google",
-                "num": 5
-            }
-            
-            search = GoogleSearch(params)
-            results = search.get_dict()
-            
-            # Extract pricing info
-            pricing_info = self._extract_pricing_info(results, company_name)
-            
-            return json.dumps(pricing_info, indent=2)
-            
-        except Exception as e:
-            logger.error(f"Error searching pricing for '{company_name}': {str(e)}")
-            return json.dumps({
-                "error": str(e),
-                "company_name": company_name
-            })
+    def _extract(self, results: Dict, company_name: str) -> Dict:
+        """Read this tool's payload from the search results"""
+        if config.FUSED_COMPANY_PROBE:
+            return _probe_payload(results, company_name)["pricing"]
+        return self._extract_pricing_info(results, company_name)
     
     def _extract_pricing_info(self, results: Dict, company_name: str) -> Dict:
         """Extract pricing information from search results"""
-        pricing = {
-            "company_name": company_name,
-            "pricing_found": False,
-            "pricing_details": [],
-            "sources": []
-        }
+        entries = (_snippet_fields({**_ORGANIC_DEFAULTS, **result})
+                   for result in results.get("organic_results", ()))
         
-        if "organic_results" in results:
-            for result in results["organic_results"]:
-                snippet = result.get("snippet", "").lower()
-                
-                # Look for pricing indicators
-                if any(keyword in snippet for keyword in ["price", "pricing", "$", "cost", "plan"]):
-                    pricing["pricing_found"] = True
-                    pricing["pricing_details"].append({
-                        "source": result.get("title", ""),
-                        "link": result.get("link", ""),
-                        "description": result.get("snippet", "")
-                    })
-                    pricing["sources"].append(result.get("link", ""))
+        # Look for pricing indicators
+        matches = [entry for entry in entries if _PRICING_RE.search(entry[2])]
         
-        return pricing
+        return _pricing_summary(company_name, matches)
 
 
-class ReviewSearchTool(BaseTool):
+class ReviewSearchTool(CompanySerpAPITool):
     """Tool for finding customer reviews and sentiment"""
     
     name: str = "Review Search Tool"
     description: str = """Search for customer reviews and feedback about a company or product.
     Input should be the company/product name. Returns review summaries and sentiment."""
     
-    api_key: str = Field(default=config.SERPAPI_API_KEY)
+    def _params(self, company_name: str) -> Dict:
+        """Build SerpAPI params; the fused probe search when enabled"""
+        if config.FUSED_COMPANY_PROBE:
+            return _probe_params(company_name, self.api_key)
+        
+        # Search for reviews
+        return {
+            "q": f"{company_name} reviews customer feedback",
+            "api_key": self.api_key,
+            "engine": "google",
+            "num": 5
+        }
     
-    def _run(self, company_name: str) -> str:
-        """Search for reviews"""
-        try:
-            logger.info(f"Searching reviews for: {company_name}")
-            
-            # Search for reviews
-            params = {
-                "q": f"{company_name} reviews customer feedback",
-                "api_key": self.api_key,
-                "engine": "google",
-                "num": 5
-            }
-            
-            search = GoogleSearch(params)
-            results = search.get_dict()
-            
-            # Extract review info
-            review_info = self._extract_review_info(results, company_name)
-            
-            return json.dumps(review_info, indent=2)
-            
-        except Exception as e:
-            logger.error(f"Error searching reviews for '{company_name}': {str(e)}")
-            return json.dumps({
-                "error": str(e),
-                "company_name": company_name
-            })
+    def _extract(self, results: Dict, company_name: str) -> Dict:
+        """Read this tool's payload from the search results"""
+        if config.FUSED_COMPANY_PROBE:
+            return _probe_payload(results, company_name)["reviews"]
+        return self._extract_review_info(results, company_name)
     
     def _extract_review_info(self, results: Dict, company_name: str) -> Dict:
         """Extract review information from search results"""
-        reviews = {
-            "company_name": company_name,
-            "reviews_found": False,
-            "review_sources": [],
-            "sentiment_indicators": []
+        entries = (_snippet_fields({**_ORGANIC_DEFAULTS, **result})
+                   for result in results.get("organic_results", ()))
+        
+        # Look for review indicators
+        matches = [entry for entry in entries if _REVIEW_RE.search(entry[2])]
+        
+        return _review_summary(company_name, matches)
+
+
+class ProbeCompetitorTool(CompanySerpAPITool):
+    """
+    Tool for gathering company info, pricing and reviews for a competitor at once
+    
+    With FUSED_COMPANY_PROBE this is one broad search split by _probe_payload;
+    otherwise the company info, pricing and review tools run side by side.
+    Either way the payload has "company_info", "pricing" and "reviews" keys.
+    """
+    
+    name: str = "Competitor Probe Tool"
+    description: str = """Get company information, pricing and customer reviews for a competitor in one call.
+    Input should be the company name. Prefer this over calling the individual tools one by one."""
+    
+    num_results: int = Field(default=20)
+    
+    def _params(self, company_name: str) -> Dict:
+        """Build the fused probe search"""
+        return _probe_params(company_name, self.api_key, self.num_results)
+    
+    def _extract(self, results: Dict, company_name: str) -> Dict:
+        """Split the fused results into info, pricing and reviews"""
+        return _probe_payload(results, company_name)
+    
+    def _parts(self) -> tuple:
+        """(payload key, tool) for each lookup an unfused probe combines"""
+        return (
+            ("company_info", company_info_tool),
+            ("pricing", pricing_search_tool),
+            ("reviews", review_search_tool)
+        )
+    
+    def _combine(self, company_name: str, results: List) -> Dict:
+        """Merge the lookups; a failed one reports its error without discarding the others"""
+        return {
+            key: tool._error(company_name, result) if isinstance(result, Exception) else result
+            for (key, tool), result in zip(self._parts(), results)
         }
+    
+    def fetch(self, company_name: str) -> Dict:
+        """Probe on the blocking session, fetching unfused parts on worker threads"""
+        if config.FUSED_COMPANY_PROBE:
+            return super().fetch(company_name)
+        
+        def lookup(tool: SerpAPITool):
+            try:
+                return tool.fetch(company_name)
+            except Exception as e:
+                return e
+        
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            results = list(executor.map(lookup, [tool for _, tool in self._parts()]))
+        
+        return self._combine(company_name, results)
+    
+    async def afetch(self, company_name: str) -> Dict:
+        """Probe without blocking the event loop, fetching unfused parts concurrently"""
+        if config.FUSED_COMPANY_PROBE:
+            return await super().afetch(company_name)
+        
+        async with serpapi_session():
+            results = await asyncio.gather(
+                *[tool.afetch(company_name) for _, tool in self._parts()],
+                return_exceptions=True
+            )
+        
+        return self._combine(company_name, results)
+
+
+async def _aserpapi_search(session: aiohttp.ClientSession, query: str, num: int = 5) -> Dict:
+    """Run a single profile search"""
+    params = {
+        "q": query,
+        "api_key": config.SERPAPI_API_KEY,
+        "engine": "google",
+        "num": num
+    }
+    
+    logger.info("Searching for: %s", query)
+    return await _serpapi_get(session, params)
+
+
+def _profile_queries(competitor_name: str) -> tuple:
+    """Expand the pricing and review query templates for a competitor"""
+    pricing_queries = [q.format(competitor_name=competitor_name) for q in config.PRICING_SEARCH_QUERIES]
+    review_queries = [q.format(competitor_name=competitor_name) for q in config.REVIEW_SEARCH_QUERIES]
+    return pricing_queries, review_queries
+
+
+def _build_profile(competitor_name: str, pricing_queries: List[str], review_queries: List[str],
+                   responses: List) -> Dict:
+    """Extract pricing and review info from raw responses, keyed by query"""
+    profile = {
+        "company_name": competitor_name,
+        "pricing": {},
+        "reviews": {}
+    }
+    
+    for query, response in zip(pricing_queries + review_queries, responses):
+        if isinstance(response, Exception):
+            logger.error("Search error for query '%s': %s", query, response)
+            result = {"error": str(response), "query": query}
+        elif query in pricing_queries:
+            result = pricing_search_tool._extract_pricing_info(response, competitor_name)
+        else:
+            result = review_search_tool._extract_review_info(response, competitor_name)
         
-        if "organic_results" in results:
-            for result in results["organic_results"]:
-                snippet = result.get("snippet", "")
-                
-                # Look for review indicators
-                if any(keyword in snippet.lower() for keyword in ["review", "rating", "customer", "feedback"]):
-                    reviews["reviews_found"] = True
-                    reviews["review_sources"].append({
-                        "source": result.get("title", ""),
-                        "link": result.get("link", ""),
-                        "snippet": snippet
-                    })
+        bucket = "pricing" if query in pricing_queries else "reviews"
+        profile[bucket][query] = result
+    
+    return profile
+
+
+async def asearch_all(competitor_name: str) -> Dict:
+    """
+    Run every pricing and review query template for a competitor concurrently
+    
+    Args:
+        competitor_name: Name of the competitor to search for
         
-        return reviews
+    Returns:
+        Dict with extracted pricing and review info keyed by query
+    """
+    pricing_queries, review_queries = _profile_queries(competitor_name)
+    
+    # Concurrency is capped by the shared SerpAPI limits in _get_json
+    async with serpapi_session() as session:
+        responses = await asyncio.gather(
+            *[_aserpapi_search(session, query) for query in pricing_queries + review_queries],
+            return_exceptions=True
+        )
+    
+    return _build_profile(competitor_name, pricing_queries, review_queries, responses)
+
+
+def search_all(competitor_name: str) -> Dict:
+    """
+    Thread-pool variant of asearch_all for synchronous callers
+    
+    Args:
+        competitor_name: Name of the competitor to search for
+        
+    Returns:
+        Dict with extracted pricing and review info keyed by query
+    """
+    pricing_queries, review_queries = _profile_queries(competitor_name)
+    
+    def search(query: str):
+        try:
+            return _google_search({
+                "q": query,
+                "api_key": config.SERPAPI_API_KEY,
+                "engine": "google",
+                "num": 5
+            })
+        except Exception as e:
+            return e
+    
+    # Threads block on socket reads, so the GIL is released while waiting
+    with ThreadPoolExecutor(max_workers=config.SEARCH_MAX_WORKERS) as executor:
+        responses = list(executor.map(search, pricing_queries + review_queries))
+    
+    return _build_profile(competitor_name, pricing_queries, review_queries, responses)
+
+
+class CompetitorProfileTool(ProbeCompetitorTool):
+    """
+    Deeper variant of the probe: every configured pricing and review query
+    
+    Shares the probe's entry points and error payload; "pricing" and
+    "reviews" hold one extracted payload per query instead of a single one.
+    """
+    
+    name: str = "Competitor Profile Tool"
+    description: str = """Search pricing and customer reviews for a specific competitor in a single step.
+    Input should be the company name. Runs all pricing and review searches at once."""
+    
+    def fetch(self, company_name: str) -> Dict:
+        """Run the profile searches on threads over the shared keep-alive session"""
+        return search_all(company_name)
+    
+    async def afetch(self, company_name: str) -> Dict:
+        """Run the profile searches concurrently without blocking the loop"""
+        return await asearch_all(company_name)
 
 
 class DataProcessorTool(BaseTool):
@@ -295,23 +978,27 @@ class DataProcessorTool(BaseTool):
     def _run(self, data: str) -> str:
         """Process competitor data"""
         try:
-            # Parse input data
+            # Parse input data; only text that opens like JSON is worth parsing,
+            # so plain prose skips the exception path entirely
             if isinstance(data, str):
-                try:
-                    data_dict = json.loads(data)
-                except json.JSONDecodeError:
-                    data_dict = {"raw_data": data}
+                text = data.lstrip()
+                data_dict = {"raw_data": data}
+                if text[:1] in ("{", "["):
+                    try:
+                        data_dict = _loads(text)
+                    except json.JSONDecodeError:  # orjson's error subclasses this
+                        pass
             else:
                 data_dict = data
             
             # Structure the data
             processed = self._structure_data(data_dict)
             
-            return json.dumps(processed, indent=2)
+            return _dumps(processed)
             
         except Exception as e:
-            logger.error(f"Error processing data: {str(e)}")
-            return json.dumps({
+            logger.error("Error processing data: %s", e)
+            return _dumps({
                 "error": str(e),
                 "raw_data": str(data)
             })
@@ -324,16 +1011,12 @@ class DataProcessorTool(BaseTool):
             "data_quality": "processed"
         }
         
-        # Process competitor information
-        if "competitors" in data:
-            for comp in data["competitors"]:
-                structured["competitors"].append({
-                    "name": comp.get("name", ""),
-                    "website": comp.get("website", ""),
-                    "description": comp.get("description", ""),
-                    "strengths": comp.get("strengths", []),
-                    "weaknesses": comp.get("weaknesses", [])
-                })
+        # Process competitor information (a top-level JSON array carries none)
+        competitors = data.get("competitors", ()) if isinstance(data, dict) else ()
+        structured["competitors"] = [
+            {k: comp.get(k) or _COMP_TEMPLATE[k] for k in _COMP_TEMPLATE}
+            for comp in competitors
+        ]
         
         return structured
 
@@ -343,4 +1026,28 @@ competitor_search_tool = CompetitorSearchTool()
 company_info_tool = CompanyInfoTool()
 pricing_search_tool = PricingSearchTool()
 review_search_tool = ReviewSearchTool()
+probe_competitor_tool = ProbeCompetitorTool()
+competitor_profile_tool = CompetitorProfileTool()
 data_processor_tool = DataProcessorTool()
+
+
+@cache
+def get_tools() -> Mapping[str, BaseTool]:
+    """
+    Process-wide registry of the shared tool instances
+    
+    The tools hold no per-call state, so every agent and crew can share them
+    instead of re-running pydantic validation for fresh instances.
+    
+    Returns:
+        Read-only mapping of tool key to instance
+    """
+    return MappingProxyType({
+        "search": competitor_search_tool,
+        "probe": probe_competitor_tool,
+        "company": company_info_tool,
+        "pricing": pricing_search_tool,
+        "reviews": review_search_tool,
+        "profile": competitor_profile_tool,
+        "data": data_processor_tool
+    })
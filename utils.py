@@ -4,23 +4,80 @@ Includes PDF export and data formatting helpers
 """
 
 import logging
-from datetime import datetime
-from typing import Dict, List, Optional
+from datetime import date, datetime
+from functools import cache, lru_cache
+from itertools import chain
+from typing import IO, Dict, Iterator, Optional
 from io import BytesIO
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_JUSTIFY
-from reportlab.platypus import (
-    SimpleDocTemplate, Paragraph, Spacer, PageBreak,
-    Table, TableStyle, KeepTogether
-)
-from reportlab.lib import colors
+from types import SimpleNamespace
 import re
 
 logger = logging.getLogger(__name__)
 
 
+@cache
+def _reportlab() -> SimpleNamespace:
+    """
+    Import reportlab on first PDF use and return the names the generator needs
+    
+    The display helpers below never touch reportlab, so importing this module
+    for them should not pay for its import graph.
+    """
+    from reportlab.lib import colors
+    from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak
+    
+    return SimpleNamespace(
+        colors=colors, TA_CENTER=TA_CENTER, TA_JUSTIFY=TA_JUSTIFY, letter=letter,
+        getSampleStyleSheet=getSampleStyleSheet, ParagraphStyle=ParagraphStyle, inch=inch,
+        SimpleDocTemplate=SimpleDocTemplate, Paragraph=Paragraph, Spacer=Spacer, PageBreak=PageBreak
+    )
+
+
+# Markdown and text-cleanup patterns, compiled once for the per-line hot paths
+_MD_BOLD = re.compile(r'\*\*(.+?)\*\*')
+_MD_ITALIC = re.compile(r'\*(.+?)\*')
+_MD_CODE = re.compile(r'`(.+?)`')
+_WS_RE = re.compile(r'\n\s*\n')
+_FN_NONWORD = re.compile(r'[^\w\s-]')
+_FN_DASH = re.compile(r'[-\s]+')
+# ASCII equivalent of _FN_NONWORD for the common all-ASCII company name
+_FN_ASCII_STRIP = str.maketrans('', '', ''.join(
+    c for c in map(chr, range(128))
+    if not (c.isalnum() or c.isspace() or c in '_-')
+))
+_NUM_LIST_RE = re.compile(r'([1-9])\. \s*(.*)')
+
+# Section keywords for format_report_for_display, in precedence order: when a
+# line names several, the earliest section listed here wins
+_SECTION_KEYWORDS = (
+    ("executive summary", "overview"),
+    ("key findings", "overview"),
+    ("detailed competitor analysis", "detailed_analysis"),
+    ("swot", "detailed_analysis"),
+    ("comparison matrix", "competitor_matrix"),
+    ("competitive comparison", "competitor_matrix"),
+    ("recommendation", "recommendations"),
+)
+# One named group per keyword: IGNORECASE also matches Unicode variants such
+# as 'ſwot', so matches are mapped back by group name, not by their text
+_SECTION_RE = re.compile(
+    '|'.join(f'(?P<k{rank}>{re.escape(k)})' for rank, (k, _) in enumerate(_SECTION_KEYWORDS)),
+    re.I
+)
+_SECTION_RANK = {f'k{rank}': (rank, section) for rank, (_, section) in enumerate(_SECTION_KEYWORDS)}
+
+# Line patterns for extract_key_metrics, case-insensitive so lines are never lowercased
+_NON_COMPETITOR_H3_RE = re.compile(r'recommendation|summary|finding', re.I)
+_KEY_FINDINGS_RE = re.compile(r'key findings', re.I)
+_OPPORTUNITIES_RE = re.compile(r'opportunities', re.I)
+_FINDING_PREFIXES = ('1.', '2.', '3.', '4.', '5.')
+_OPPORTUNITY_PREFIXES = ('1.', '2.', '3.', '-', '*')
+
+
 class PDFReportGenerator:
     """Generate professional PDF reports from competitor analysis results"""
     
@@ -32,225 +89,276 @@ class PDFReportGenerator:
             company_name: Name of the company being analyzed
             industry: Industry sector
         """
+        self._rl = _reportlab()
         self.company_name = company_name
         self.industry = industry
-        self.buffer = BytesIO()
-        self.styles = getSampleStyleSheet()
+        self.styles = self._rl.getSampleStyleSheet()
         self._create_custom_styles()
         
     def _create_custom_styles(self):
         """Create custom paragraph styles for the report"""
+        rl = self._rl
+        
         # Title style
-        self.styles.add(ParagraphStyle(
+        self.styles.add(rl.ParagraphStyle(
             name='CustomTitle',
             parent=self.styles['Heading1'],
             fontSize=24,
-            textColor=colors.HexColor('#1a1a1a'),
+            textColor=rl.colors.HexColor('#1a1a1a'),
             spaceAfter=30,
-            alignment=TA_CENTER,
+            alignment=rl.TA_CENTER,
             fontName='Helvetica-Bold'
         ))
         
         # Heading 2 style
-        self.styles.add(ParagraphStyle(
+        self.styles.add(rl.ParagraphStyle(
             name='CustomHeading2',
             parent=self.styles['Heading2'],
             fontSize=16,
-            textColor=colors.HexColor('#2c3e50'),
+            textColor=rl.colors.HexColor('#2c3e50'),
             spaceAfter=12,
             spaceBefore=12,
             fontName='Helvetica-Bold'
         ))
         
         # Heading 3 style
-        self.styles.add(ParagraphStyle(
+        self.styles.add(rl.ParagraphStyle(
             name='CustomHeading3',
             parent=self.styles['Heading3'],
             fontSize=14,
-            textColor=colors.HexColor('#34495e'),
+            textColor=rl.colors.HexColor('#34495e'),
             spaceAfter=10,
             spaceBefore=10,
             fontName='Helvetica-Bold'
         ))
         
         # Body text style
-        self.styles.add(ParagraphStyle(
+        self.styles.add(rl.ParagraphStyle(
             name='CustomBody',
             parent=self.styles['BodyText'],
             fontSize=11,
             leading=16,
-            textColor=colors.HexColor('#2c3e50'),
-            alignment=TA_JUSTIFY,
+            textColor=rl.colors.HexColor('#2c3e50'),
+            alignment=rl.TA_JUSTIFY,
             spaceAfter=10
         ))
         
         # Bullet point style
-        self.styles.add(ParagraphStyle(
+        self.styles.add(rl.ParagraphStyle(
             name='CustomBullet',
             parent=self.styles['BodyText'],
             fontSize=10,
             leading=14,
-            textColor=colors.HexColor('#2c3e50'),
+            textColor=rl.colors.HexColor('#2c3e50'),
             leftIndent=20,
             spaceAfter=6
         ))
+        
+        # Bound once so the parse loop skips the stylesheet lookup per element
+        self._s_title = self.styles['CustomTitle']
+        self._s_h2 = self.styles['CustomHeading2']
+        self._s_h3 = self.styles['CustomHeading3']
+        self._s_body = self.styles['CustomBody']
+        self._s_bullet = self.styles['CustomBullet']
     
-    def generate_pdf(self, report_content: str) -> BytesIO:
+    def generate_pdf(
+        self,
+        report_content: str,
+        output_stream: Optional[IO[bytes]] = None
+    ) -> Optional[BytesIO]:
         """
         Generate PDF from report content
         
         Args:
             report_content: Full report text content
+            output_stream: Writable binary stream to render into directly,
+                e.g. an open file or HTTP response (default: in-memory buffer)
             
         Returns:
-            BytesIO: PDF file buffer
+            BytesIO: PDF file buffer, or None when written to output_stream
         """
+        rl = self._rl
         try:
             logger.info(f"Generating PDF report for {self.company_name}")
             
+            # Fresh buffer per call so a second build never appends to the first
+            buffer = BytesIO() if output_stream is None else None
+            
             # Create PDF document
-            doc = SimpleDocTemplate(
-                self.buffer,
-                pagesize=letter,
+            doc = rl.SimpleDocTemplate(
+                output_stream if buffer is None else buffer,
+                pagesize=rl.letter,
                 rightMargin=72,
                 leftMargin=72,
                 topMargin=72,
                 bottomMargin=72
             )
             
-            # Build content elements
-            elements = []
-            
-            # Add title page
-            elements.extend(self._create_title_page())
-            
-            # Parse and add report content
-            elements.extend(self._parse_report_content(report_content))
+            # Build content elements: title page, then the parsed report
+            elements = list(chain(
+                self._create_title_page(),
+                self._parse_report_content(report_content)
+            ))
             
             # Build PDF
             doc.build(elements)
             
-            # Reset buffer position
-            self.buffer.seek(0)
-            
             logger.info("PDF generated successfully")
-            return self.buffer
+            
+            if buffer is None:
+                return None
+            
+            # Reset buffer position
+            buffer.seek(0)
+            return buffer
             
         except Exception as e:
             logger.error(f"Error generating PDF: {str(e)}")
             raise
     
-    def _create_title_page(self) -> List:
-        """Create title page elements"""
-        elements = []
+    def _create_title_page(self) -> Iterator:
+        """Yield title page elements"""
+        rl = self._rl
         
         # Title
-        title = Paragraph(
+        yield rl.Paragraph(
             "COMPETITOR ANALYSIS REPORT",
-            self.styles['CustomTitle']
+            self._s_title
         )
-        elements.append(title)
-        elements.append(Spacer(1, 0.3 * inch))
+        yield rl.Spacer(1, 0.3 * rl.inch)
         
         # Company name
-        company = Paragraph(
+        yield rl.Paragraph(
             f"<b>{self.company_name}</b>",
-            self.styles['CustomHeading2']
+            self._s_h2
         )
-        elements.append(company)
-        elements.append(Spacer(1, 0.2 * inch))
+        yield rl.Spacer(1, 0.2 * rl.inch)
         
         # Industry
-        industry = Paragraph(
+        yield rl.Paragraph(
             f"Industry: {self.industry}",
-            self.styles['CustomBody']
+            self._s_body
         )
-        elements.append(industry)
-        elements.append(Spacer(1, 0.1 * inch))
+        yield rl.Spacer(1, 0.1 * rl.inch)
         
         # Date
-        date = Paragraph(
+        yield rl.Paragraph(
             f"Report Date: {datetime.now().strftime('%B %d, %Y')}",
-            self.styles['CustomBody']
+            self._s_body
         )
-        elements.append(date)
         
         # Add page break
-        elements.append(PageBreak())
-        
-        return elements
+        yield rl.PageBreak()
     
-    def _parse_report_content(self, content: str) -> List:
-        """Parse markdown-style report content into PDF elements"""
-        elements = []
-        lines = content.split('\n')
+    def _parse_report_content(self, content: str) -> Iterator:
+        """Parse markdown-style report content, yielding PDF elements"""
+        rl = self._rl
+        
+        # Locals for the per-line hot path
+        handlers = self._PREFIX_HANDLERS
+        numbered = _NUM_LIST_RE.match
+        clean_markdown = self._clean_markdown
+        body_style = self._s_body
+        
+        # Spacer held back until the next other element, so a run of adjacent
+        # gaps (e.g. an H1's gap followed by an H2's) collapses to the tallest
+        gap = None
         
-        i = 0
-        while i < len(lines):
-            line = lines[i].strip()
+        for line in content.splitlines():
+            line = line.strip()
             
             # Skip empty lines
             if not line:
-                i += 1
                 continue
             
-            # Handle headers
-            if line.startswith('# '):
-                # H1
-                text = line[2:].strip()
-                elements.append(Paragraph(text, self.styles['CustomTitle']))
-                elements.append(Spacer(1, 0.2 * inch))
-                
-            elif line.startswith('## '):
-                # H2
-                text = line[3:].strip()
-                elements.append(Spacer(1, 0.15 * inch))
-                elements.append(Paragraph(text, self.styles['CustomHeading2']))
-                elements.append(Spacer(1, 0.1 * inch))
-                
-            elif line.startswith('### '):
-                # H3
-                text = line[4:].strip()
-                elements.append(Paragraph(text, self.styles['CustomHeading3']))
-                elements.append(Spacer(1, 0.05 * inch))
-                
-            elif line.startswith('- ') or line.startswith('* '):
-                # Bullet point
-                text = line[2:].strip()
-                bullet = Paragraph(f"• {text}", self.styles['CustomBullet'])
-                elements.append(bullet)
+            # Dispatch on the leading token ("#", "##", "- ", ...)
+            marker, _, rest = line.partition(' ')
+            handler = handlers.get(marker) if rest else None
+            
+            if handler is not None:
+                emitted = handler(self, rest.strip())
                 
-            elif line.startswith('1. ') or line.startswith('2. ') or line.startswith('3. '):
+            elif (m := numbered(line)) is not None:
                 # Numbered list
-                text = line[3:].strip()
-                num = line[0]
-                bullet = Paragraph(f"{num}. {text}", self.styles['CustomBullet'])
-                elements.append(bullet)
+                emitted = self._emit_numbered(*m.groups())
                 
             elif line.startswith('---'):
                 # Horizontal rule
-                elements.append(Spacer(1, 0.1 * inch))
+                emitted = self._emit_hr('')
                 
             else:
-                # Regular paragraph
-                if line:
-                    # Clean up markdown formatting
-                    text = self._clean_markdown(line)
-                    para = Paragraph(text, self.styles['CustomBody'])
-                    elements.append(para)
+                # Regular paragraph; clean up markdown formatting
+                emitted = (rl.Paragraph(clean_markdown(line), body_style),)
             
-            i += 1
+            for element in emitted:
+                if isinstance(element, rl.Spacer):
+                    if gap is None or element.height > gap.height:
+                        gap = element
+                    continue
+                if gap is not None:
+                    yield gap
+                    gap = None
+                yield element
         
-        return elements
+        if gap is not None:
+            yield gap
+    
+    def _emit_h1(self, text: str) -> tuple:
+        """H1"""
+        rl = self._rl
+        return (
+            rl.Paragraph(text, self._s_title),
+            rl.Spacer(1, 0.2 * rl.inch)
+        )
+    
+    def _emit_h2(self, text: str) -> tuple:
+        """H2"""
+        rl = self._rl
+        return (
+            rl.Spacer(1, 0.15 * rl.inch),
+            rl.Paragraph(text, self._s_h2),
+            rl.Spacer(1, 0.1 * rl.inch)
+        )
+    
+    def _emit_h3(self, text: str) -> tuple:
+        """H3"""
+        rl = self._rl
+        return (
+            rl.Paragraph(text, self._s_h3),
+            rl.Spacer(1, 0.05 * rl.inch)
+        )
+    
+    def _emit_bullet(self, text: str) -> tuple:
+        """Bullet point"""
+        return (self._rl.Paragraph(f"• {text}", self._s_bullet),)
+    
+    def _emit_numbered(self, num: str, text: str) -> tuple:
+        """Numbered list item"""
+        return (self._rl.Paragraph(f"{num}. {self._clean_markdown(text)}", self._s_bullet),)
+    
+    def _emit_hr(self, text: str) -> tuple:
+        """Horizontal rule"""
+        rl = self._rl
+        return (rl.Spacer(1, 0.1 * rl.inch),)
+    
+    # Leading token -> element builder; "---" rules also match without a space
+    _PREFIX_HANDLERS = {
+        '#': _emit_h1,
+        '##': _emit_h2,
+        '###': _emit_h3,
+        '-': _emit_bullet,
+        '*': _emit_bullet,
+        '---': _emit_hr,
+    }
     
     def _clean_markdown(self, text: str) -> str:
         """Clean markdown formatting for PDF rendering"""
         # Bold
-        text = re.sub(r'\*\*(.+?)\*\*', r'<b>\1</b>', text)
+        text = _MD_BOLD.sub(r'<b>\1</b>', text)
         # Italic
-        text = re.sub(r'\*(.+?)\*', r'<i>\1</i>', text)
+        text = _MD_ITALIC.sub(r'<i>\1</i>', text)
         # Code (inline)
-        text = re.sub(r'`(.+?)`', r'<font name="Courier">\1</font>', text)
+        text = _MD_CODE.sub(r'<font name="Courier">\1</font>', text)
         
         return text
 
@@ -265,55 +373,32 @@ def format_report_for_display(report_content: str) -> Dict[str, str]:
     Returns:
         Dict mapping section names to content
     """
-    sections = {
-        "overview": "",
-        "detailed_analysis": "",
-        "competitor_matrix": "",
-        "recommendations": ""
+    # Lines per section, joined once on return; a repeated section header
+    # starts that section over, as before
+    section_lines = {
+        "overview": [],
+        "detailed_analysis": [],
+        "competitor_matrix": [],
+        "recommendations": []
     }
     
     try:
         # Split content into sections based on headers
-        current_section = None
-        current_content = []
+        current_content = None
         
-        lines = report_content.split('\n')
+        lines = report_content.splitlines()
         
         for line in lines:
-            line_lower = line.lower().strip()
-            
             # Detect section headers
-            if 'executive summary' in line_lower or 'key findings' in line_lower:
-                if current_section:
-                    sections[current_section] = '\n'.join(current_content)
-                current_section = "overview"
-                current_content = [line]
-                
-            elif 'detailed competitor analysis' in line_lower or 'swot' in line_lower:
-                if current_section:
-                    sections[current_section] = '\n'.join(current_content)
-                current_section = "detailed_analysis"
-                current_content = [line]
-                
-            elif 'comparison matrix' in line_lower or 'competitive comparison' in line_lower:
-                if current_section:
-                    sections[current_section] = '\n'.join(current_content)
-                current_section = "competitor_matrix"
-                current_content = [line]
+            ranks = [_SECTION_RANK[m.lastgroup] for m in _SECTION_RE.finditer(line)]
+            if ranks:
+                _, current_section = min(ranks)
+                current_content = section_lines[current_section] = [line]
                 
-            elif 'recommendation' in line_lower or 'strategic' in line_lower and 'recommendation' in line_lower:
-                if current_section:
-                    sections[current_section] = '\n'.join(current_content)
-                current_section = "recommendations"
-                current_content = [line]
-                
-            else:
-                if current_section:
-                    current_content.append(line)
+            elif current_content is not None:
+                current_content.append(line)
         
-        # Add final section
-        if current_section:
-            sections[current_section] = '\n'.join(current_content)
+        sections = {name: '\n'.join(content) for name, content in section_lines.items()}
         
         # If sections are empty, put everything in overview
         if not any(sections.values()):
@@ -321,6 +406,7 @@ def format_report_for_display(report_content: str) -> Dict[str, str]:
             
     except Exception as e:
         logger.error(f"Error formatting report: {str(e)}")
+        sections = dict.fromkeys(section_lines, "")
         sections["overview"] = report_content
     
     return sections
@@ -344,36 +430,37 @@ def extract_key_metrics(report_content: str) -> Dict:
     }
     
     try:
-        lines = report_content.split('\n')
+        # One walk over the lines; findings and opportunities each run from
+        # their first header to the next "##" heading
+        in_findings = in_opportunities = False
+        findings_done = opportunities_done = False
         
-        # Count competitors (look for ### headings in competitor sections)
-        for line in lines:
-            if line.startswith('### ') and not any(x in line.lower() for x in ['recommendation', 'summary', 'finding']):
+        for line in report_content.splitlines():
+            stripped = line.strip()
+            
+            # Count competitors (look for ### headings in competitor sections)
+            if line.startswith('### ') and not _NON_COMPETITOR_H3_RE.search(line):
                 metrics["num_competitors"] += 1
-        
-        # Extract key findings (numbered lists in key findings section)
-        in_findings = False
-        for line in lines:
-            if 'key findings' in line.lower():
-                in_findings = True
-                continue
-            if in_findings:
-                if line.strip().startswith(('1.', '2.', '3.', '4.', '5.')):
-                    metrics["key_findings"].append(line.strip()[3:].strip())
-                elif line.startswith('##'):
-                    break
-        
-        # Count opportunities
-        in_opportunities = False
-        for line in lines:
-            if 'market opportunities' in line.lower() or 'opportunities' in line.lower():
-                in_opportunities = True
-                continue
-            if in_opportunities:
-                if line.strip().startswith(('1.', '2.', '3.', '-', '*')):
-                    metrics["opportunities"] += 1
-                elif line.startswith('##'):
-                    break
+            
+            # Extract key findings (numbered lists in key findings section)
+            if not findings_done:
+                if _KEY_FINDINGS_RE.search(line):
+                    in_findings = True
+                elif in_findings:
+                    if stripped.startswith(_FINDING_PREFIXES):
+                        metrics["key_findings"].append(stripped[3:].strip())
+                    elif line.startswith('##'):
+                        findings_done = True
+            
+            # Count opportunities
+            if not opportunities_done:
+                if _OPPORTUNITIES_RE.search(line):
+                    in_opportunities = True
+                elif in_opportunities:
+                    if stripped.startswith(_OPPORTUNITY_PREFIXES):
+                        metrics["opportunities"] += 1
+                    elif line.startswith('##'):
+                        opportunities_done = True
                     
     except Exception as e:
         logger.error(f"Error extracting metrics: {str(e)}")
@@ -392,14 +479,26 @@ def clean_text_for_export(text: str) -> str:
         Cleaned text
     """
     # Remove excessive whitespace
-    text = re.sub(r'\n\s*\n', '\n\n', text)
+    text = _WS_RE.sub('\n\n', text)
     
-    # Remove non-printable characters
-    text = ''.join(char for char in text if char.isprintable() or char == '\n')
+    # Remove non-printable characters; reports are almost always clean, so
+    # only build a table, from the distinct characters present, when the
+    # C-level check fails
+    if not text.replace('\n', ' ').isprintable():
+        text = text.translate({
+            ord(char): None for char in set(text)
+            if char != '\n' and not char.isprintable()
+        })
     
     return text.strip()
 
 
+@lru_cache(maxsize=1)
+def _day_stamp(day: date) -> str:
+    """Filename timestamp, formatted once per day"""
+    return day.strftime('%Y%m%d')
+
+
 def generate_filename(company_name: str, extension: str = "pdf") -> str:
     """
     Generate a clean filename for exports
@@ -412,11 +511,14 @@ def generate_filename(company_name: str, extension: str = "pdf") -> str:
         Clean filename
     """
     # Clean company name
-    clean_name = re.sub(r'[^\w\s-]', '', company_name)
-    clean_name = re.sub(r'[-\s]+', '_', clean_name)
+    if company_name.isascii():
+        clean_name = company_name.translate(_FN_ASCII_STRIP)
+    else:
+        clean_name = _FN_NONWORD.sub('', company_name)
+    clean_name = _FN_DASH.sub('_', clean_name)
     
     # Add timestamp
-    timestamp = datetime.now().strftime('%Y%m%d')
+    timestamp = _day_stamp(date.today())
     
     filename = f"competitor_analysis_{clean_name}_{timestamp}.{extension}"
     